@@ -1,14 +1,21 @@
 import os
 import jwt
+from hashlib import sha256
+from secrets import token_hex, token_urlsafe
 from typing import Any, Dict
 from datetime import datetime, timedelta
-from sqlalchemy import select
+from sqlalchemy import and_, insert, select, update
+from Models.RefreshToken import RefreshTokenModel
 from Models.User import UserModel
 from Utils.Constants import ACTIVE, SUCCESS_STATUS, UNAUTHORIZED_STATUS
 from Utils.ExceptionsTools import CustomException
-from Utils.GeneralTools import get_input_data, decrypt_password
+from Utils.Auth.Passwords import password_hasher
+from Utils.GeneralTools import get_input_data
 from Utils.Validations import Validations
 
+# Days a refresh token can be used to get a new access token
+REFRESH_TOKEN_DAYS = int(os.getenv("REFRESH_TOKEN_DAYS", 14))
+
 
 class Auth:
     """Class to manage user authentication."""
@@ -34,25 +41,178 @@ class Auth:
         self.validations.validate_data(request, self.fields)
 
         user = self._get_user_by_username(request.get("username"))
-        if not user or not decrypt_password(
-            request["password"], user.password
-        ):
+        is_valid, new_hash = (
+            password_hasher.verify_and_update(
+                request["password"], user.password
+            ) if user else (False, None)
+        )
+        if not is_valid:
             raise CustomException(
                 "Credenciales incorrectas", UNAUTHORIZED_STATUS
             )
 
+        if new_hash:
+            # BCRYPT_ROUNDS changed since the password was stored
+            self.db.update(
+                update(UserModel)
+                .where(UserModel.user_id == user.user_id)
+                .values(password=new_hash)
+            )
+
         token = self._generate_token(user.user_id)
+        refresh_token = self._issue_refresh_token(user.user_id)
 
         return {
             "statusCode": SUCCESS_STATUS if user else UNAUTHORIZED_STATUS,
-            "data": {"token": token}
+            "data": {"token": token, "refresh_token": refresh_token}
             if user else "No se pudo generar el token",
         }
 
+    def refresh(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Exchange a refresh token for a new token and refresh token.
+
+        The refresh token is rotated: it's revoked and a new one of the same
+        family is issued. Presenting a revoked token means it was stolen or
+        replayed, so every token of its family is revoked.
+
+        Args:
+            event (Dict[str, Any]):
+                The event data containing the refresh_token.
+
+        Returns:
+            Dict[str, Any]: The response containing both new tokens.
+        """
+        request = get_input_data(event)
+        self.validations.validate_data(request, {"refresh_token": str})
+
+        stored = self.db.query(
+            select(
+                RefreshTokenModel.refresh_token_id,
+                RefreshTokenModel.user_id,
+                RefreshTokenModel.family_id,
+                RefreshTokenModel.expires_at,
+                RefreshTokenModel.revoked,
+            )
+            .join(
+                UserModel,
+                and_(
+                    UserModel.user_id == RefreshTokenModel.user_id,
+                    UserModel.active == ACTIVE,
+                ),
+            )
+            .where(
+                RefreshTokenModel.token_hash ==
+                self._hash_token(request["refresh_token"])
+            )
+        ).first()
+
+        if not stored or stored.expires_at <= datetime.utcnow():
+            raise CustomException(
+                "Token de actualización inválido o expirado.",
+                UNAUTHORIZED_STATUS,
+            )
+
+        # Only one request can rotate a token, a concurrent one is reuse
+        rotated = not stored.revoked and self.db.update(
+            update(RefreshTokenModel)
+            .where(
+                RefreshTokenModel.refresh_token_id ==
+                stored.refresh_token_id,
+                RefreshTokenModel.revoked == 0,
+            )
+            .values(revoked=1)
+        )
+        if not rotated:
+            self._revoke_family(stored.family_id)
+            raise CustomException(
+                "Token de actualización inválido o expirado.",
+                UNAUTHORIZED_STATUS,
+            )
+
+        return {
+            "statusCode": SUCCESS_STATUS,
+            "data": {
+                "token": self._generate_token(stored.user_id),
+                "refresh_token": self._issue_refresh_token(
+                    stored.user_id, stored.family_id
+                ),
+            },
+        }
+
+    def revoke(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Revoke a refresh token and the ones rotated from the same login
+        (logout).
+
+        Args:
+            event (Dict[str, Any]):
+                The event data containing the refresh_token.
+
+        Returns:
+            Dict[str, Any]: The response indicating if it was revoked.
+        """
+        request = get_input_data(event)
+        self.validations.validate_data(request, {"refresh_token": str})
+
+        stored = self.db.query(
+            select(RefreshTokenModel.family_id).where(
+                RefreshTokenModel.token_hash ==
+                self._hash_token(request["refresh_token"])
+            )
+        ).first()
+
+        is_revoked = bool(stored) and self._revoke_family(stored.family_id)
+
+        return {
+            "statusCode": SUCCESS_STATUS,
+            "data": {"is_revoked": bool(is_revoked)},
+        }
+
+    def revoke_user_tokens(self, user_id: int) -> int:
+        """Revoke every refresh token of the user, returns the amount."""
+        return self.db.update(
+            update(RefreshTokenModel)
+            .where(
+                RefreshTokenModel.user_id == user_id,
+                RefreshTokenModel.revoked == 0,
+            )
+            .values(revoked=1)
+        )
+
     def _get_user_by_username(self, username: str) -> UserModel:
         stmt = select(UserModel).filter_by(username=username, active=ACTIVE)
         return self.db.query(stmt).first()
 
+    @staticmethod
+    def _hash_token(refresh_token: str) -> str:
+        return sha256(refresh_token.encode("utf-8")).hexdigest()
+
+    def _issue_refresh_token(self, user_id: int, family_id: str = None) -> str:
+        """Store the hash of a new refresh token and return the token."""
+        refresh_token = token_urlsafe(48)
+        self.db.add(
+            insert(RefreshTokenModel).values(
+                user_id=user_id,
+                token_hash=self._hash_token(refresh_token),
+                family_id=family_id or token_hex(16),
+                expires_at=(
+                    datetime.utcnow() + timedelta(days=REFRESH_TOKEN_DAYS)
+                ),
+            )
+        )
+        return refresh_token
+
+    def _revoke_family(self, family_id: str) -> int:
+        return self.db.update(
+            update(RefreshTokenModel)
+            .where(
+                RefreshTokenModel.family_id == family_id,
+                RefreshTokenModel.revoked == 0,
+            )
+            .values(revoked=1)
+        )
+
     def _generate_token(self, user_id: int) -> str:
         """Generate a JWT token with expiration for the user."""
         payload = {
@@ -0,0 +1,306 @@
+import os
+from json import dumps as json_dumps, loads as json_loads
+from shutil import rmtree
+from tempfile import mkdtemp
+from typing import Any, Dict
+from sqlalchemy import insert, select, update
+from Classes.MaintenanceReport import MaintenanceReport
+from Classes.MaintenanceStatus import MaintenanceStatus
+from Models.ExportJob import ExportJobModel
+from Utils.Constants import (
+    ACTIVE,
+    ACCEPTED_STATUS,
+    SUCCESS_STATUS,
+    ERROR_STATUS,
+    NO_DATA_STATUS,
+)
+from Utils.ExcelManager import ExcelManager, ExcelManagerData
+from Utils.ExceptionsTools import CustomException
+from Utils.ExportManager import ExportManager, CSV_FORMAT, PARQUET_FORMAT
+from Utils.GeneralTools import get_input_data
+from Utils.JobQueue import get_job_queue
+from Utils.S3Manager import S3Manager, transfer_config
+from Utils.Validations import Validations
+
+# Job statuses
+PENDING_STATUS = "pending"
+RUNNING_STATUS = "running"
+DONE_STATUS = "done"
+FAILED_STATUS = "failed"
+
+XLSX_FORMAT = "xlsx"
+ZIP_FORMAT = "zip"
+EXPORT_FORMATS = (XLSX_FORMAT, CSV_FORMAT, PARQUET_FORMAT)
+EXPORT_ROUTE = "exports/"
+
+
+class ExportJob:
+    """Class to manage asynchronous export jobs."""
+
+    def __init__(self, db):
+        self.db = db
+        self.bucket_name = os.getenv("BUCKET_NAME")
+        self.validations = Validations(db)
+        self.fields = {"export_type": str, "file_format": str}
+        # Export type -> builder of its ExcelManagerData (single sheet)
+        self.exports = {
+            "maintenance_status": self._maintenance_status_data,
+        }
+        # Export type -> builder uploading its own file, returns the key
+        self.reports = {
+            "maintenance_report": self._maintenance_report,
+        }
+        # Export type -> filters accepted in params and their types
+        self.params_fields = {
+            "maintenance_status": {
+                "maintenance_status_cab_id": int,
+                "equipment_id": int,
+                "maintenance_status_id": int,
+            },
+            # One id or a list of ids
+            "maintenance_report": {"equipment_id": list},
+        }
+
+    def create_export_job(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Register an export job and queue it for the export worker.
+
+        Args:
+            event (Dict[str, Any]):
+                The event data containing export_type, file_format and
+                optional params (filters of the export).
+
+        Returns:
+            Dict[str, Any]:
+                The export_job_id to poll with get_export_job.
+        """
+        request = {"file_format": XLSX_FORMAT, **get_input_data(event)}
+        self.validations.validate_data(request, self.fields)
+
+        export_types = [*self.exports, *self.reports]
+        if request["export_type"] not in export_types:
+            raise CustomException(
+                "Tipo de exportación no válido. Tipos permitidos: "
+                f"{', '.join(export_types)}"
+            )
+
+        if request["export_type"] in self.reports:
+            request["file_format"] = ZIP_FORMAT
+        elif request["file_format"] not in EXPORT_FORMATS:
+            raise CustomException(
+                "Formato no válido. Formatos permitidos: "
+                f"{', '.join(EXPORT_FORMATS)}"
+            )
+
+        params = request.get("params") or {}
+        self._validate_params(request["export_type"], params)
+
+        export_job_id = self.db.add(
+            insert(ExportJobModel).values(
+                user_id=event.get("user_id", 0),
+                export_type=request["export_type"],
+                file_format=request["file_format"],
+                params=json_dumps(params),
+                status=PENDING_STATUS,
+            )
+        )
+
+        if not export_job_id:
+            raise CustomException(
+                "No se pudo crear la exportación.", ERROR_STATUS
+            )
+
+        get_job_queue(
+            lambda payload: self.run_export_job(payload["export_job_id"])
+        ).enqueue({"export_job_id": export_job_id})
+
+        return {
+            "statusCode": ACCEPTED_STATUS,
+            "data": {
+                "export_job_id": export_job_id,
+                "status": PENDING_STATUS,
+            },
+        }
+
+    def get_export_job(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Get the status of an export job of the current user, including the
+        download url once it is done.
+
+        Args:
+            event (Dict[str, Any]):
+                The event data containing the export_job_id.
+
+        Returns:
+            Dict[str, Any]:
+                The job status, error and url.
+        """
+        export_job_id = get_input_data(event).get("export_job_id", 0)
+
+        job = self.db.query(
+            select(
+                ExportJobModel.export_job_id,
+                ExportJobModel.status,
+                ExportJobModel.s3_key,
+                ExportJobModel.error,
+            ).filter_by(
+                export_job_id=export_job_id,
+                user_id=event.get("user_id", 0),
+                active=ACTIVE,
+            )
+        ).first()
+
+        if not job:
+            raise CustomException(
+                "No se encontró la exportación.", NO_DATA_STATUS
+            )
+
+        job = job.as_dict()
+        s3_key = job.pop("s3_key")
+
+        if job["status"] == DONE_STATUS:
+            job["url"] = S3Manager().presigned_download_file(
+                self.bucket_name, s3_key
+            ).get("data", {}).get("url")
+
+        return {"statusCode": SUCCESS_STATUS, "data": job}
+
+    def run_export_job(self, export_job_id: int) -> Dict[str, Any]:
+        """
+        Build the file of an export job and upload it to S3. Executed by
+        the export worker, outside the API timeout.
+
+        Args:
+            export_job_id (int): The ID of the export job.
+
+        Returns:
+            Dict[str, Any]: The final job status.
+        """
+        job = self.db.query(
+            select(ExportJobModel).filter_by(
+                export_job_id=export_job_id, active=ACTIVE
+            )
+        ).first()
+
+        # Retried invocations may find the job already finished
+        if not job or job.status in (DONE_STATUS, FAILED_STATUS):
+            return {
+                "export_job_id": export_job_id,
+                "status": job.status if job else None,
+            }
+
+        self._update_job(export_job_id, status=RUNNING_STATUS)
+
+        params = json_loads(job.params or "{}")
+        filename = f"{job.export_type}_{export_job_id}"
+
+        try:
+            # Jobs may have been stored before params were validated
+            self._validate_params(job.export_type, params)
+            if job.export_type in self.reports:
+                s3_key = self.reports[job.export_type](params, filename)
+            else:
+                s3_key = self._build_and_upload(
+                    filename,
+                    job.file_format,
+                    self.exports[job.export_type](params),
+                )
+            values = {"status": DONE_STATUS, "s3_key": s3_key}
+        except Exception as e:
+            print(f"Error: export job {export_job_id}: {str(e)}")
+            values = {"status": FAILED_STATUS, "error": str(e)}
+
+        self._update_job(export_job_id, **values)
+        return {"export_job_id": export_job_id, "status": values["status"]}
+
+    def _validate_params(
+        self, export_type: str, params: Dict[str, Any]
+    ) -> None:
+        """
+        Validate the filters of an export against params_fields.
+
+        Raises:
+            CustomException: If params is not an object or has unknown keys.
+            AssertionError: If a filter has an invalid value.
+        """
+        if type(params) is not dict:
+            raise CustomException("Los parámetros deben ser un objeto.")
+
+        fields = self.params_fields.get(export_type, {})
+        unknown = [key for key in params if key not in fields]
+        if unknown:
+            raise CustomException(
+                f"Parámetros no permitidos: {', '.join(unknown)}. "
+                f"Parámetros permitidos: {', '.join(fields) or 'ninguno'}"
+            )
+
+        # Single values are accepted where a list is expected
+        values = {
+            key: [value] if fields[key] is list and type(value) is not list
+            else value
+            for key, value in params.items()
+        }
+        self.validations.validate_data(values, fields, is_update=True)
+        for key, value in values.items():
+            if fields[key] is list:
+                for item in value:
+                    self.validations.validate_data({key: item}, {key: int})
+
+    def _build_and_upload(
+        self, filename: str, file_format: str, file_data: ExcelManagerData
+    ) -> str:
+        """Write the export file in /tmp, upload it and return its key."""
+        # /tmp is shared between invocations of the container. Each build
+        # gets its own directory, removed even when the build fails half
+        # way, when the generators don't report the partial file
+        directory = mkdtemp(prefix=f"{filename}_")
+        try:
+            if file_format == XLSX_FORMAT:
+                result = ExcelManager(
+                    filename,
+                    streaming=True,
+                    file_route=f"{directory}/",
+                    tmpdir=directory,
+                ).generate_streaming_file(file_data)
+                route = result["file_route"]
+            else:
+                result = ExportManager(
+                    filename, file_format, file_route=f"{directory}/"
+                ).generate_file(file_data)
+                route = next(iter(result["file_route"].values()), None)
+
+            if not result["success"]:
+                raise Exception(result["message"])
+
+            s3_key = f"{EXPORT_ROUTE}{route.rsplit('/', 1)[-1]}"
+            S3Manager().client.upload_file(
+                route, self.bucket_name, s3_key, Config=transfer_config
+            )
+        finally:
+            rmtree(directory, ignore_errors=True)
+
+        return s3_key
+
+    def _update_job(self, export_job_id: int, **values: Any) -> None:
+        self.db.update(
+            update(ExportJobModel)
+            .where(ExportJobModel.export_job_id == export_job_id)
+            .values(**values)
+        )
+
+    def _maintenance_status_data(
+        self, params: Dict[str, Any]
+    ) -> ExcelManagerData:
+        return {
+            "Mantenimientos": {
+                "data": self.db.stream(
+                    MaintenanceStatus.maintenance_status_stmt(params)
+                ),
+            }
+        }
+
+    def _maintenance_report(
+        self, params: Dict[str, Any], filename: str
+    ) -> str:
+        # Built on use, the API Lambda has no wkhtmltopdf binary
+        return MaintenanceReport(self.db).generate_report(params, filename)
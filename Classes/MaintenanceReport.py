@@ -0,0 +1,176 @@
+import os
+from html import escape
+from itertools import groupby, islice
+from time import perf_counter
+from typing import Any, Dict, Iterator, List
+from zipfile import ZipFile, ZIP_DEFLATED
+from sqlalchemy import select
+from Models.Equipment import EquipmentModel
+from Models.MaintenanceStatus import MaintenanceStatusModel
+from Models.MaintenanceStatusDet import MaintenanceStatusDetModel
+from Utils.Constants import ACTIVE
+from Utils.GeneralTools import generate_hash_from_date
+from Utils.PdfGenerator import PDFGenerator
+from Utils.S3Manager import S3Manager, transfer_config
+
+REPORT_ROUTE = "reports/maintenance/"
+# Equipments rendered concurrently before being written to the bundle
+REPORT_BATCH_SIZE = 16
+
+REPORT_TEMPLATE = """
+<html>
+  <head><meta charset="utf-8"></head>
+  <body>
+    <h1>Historial de mantenimiento</h1>
+    <p><b>Equipo:</b> {description}</p>
+    <p><b>Serial:</b> {serial} &nbsp; <b>Modelo:</b> {model}</p>
+    <table border="1" cellspacing="0" cellpadding="4" width="100%">
+      <tr><th>Fecha</th><th>Estado</th><th>Usuario</th><th>Activo</th></tr>
+      {rows}
+    </table>
+  </body>
+</html>
+"""
+
+REPORT_ROW_TEMPLATE = (
+    "<tr><td>{created_at}</td><td>{status}</td>"
+    "<td>{user_id}</td><td>{active}</td></tr>"
+)
+
+
+class MaintenanceReport:
+    """Class to generate maintenance history reports per equipment."""
+
+    def __init__(self, db, pdf_generator: PDFGenerator = None):
+        self.db = db
+        self.bucket_name = os.getenv("BUCKET_NAME")
+        self.pdf_generator = pdf_generator or PDFGenerator()
+        self.metrics: Dict[str, Any] = {}
+
+    def generate_report(self, params: Dict[str, Any], filename: str) -> str:
+        """
+        Render one PDF per equipment and upload them as a zip bundle.
+
+        Equipments are streamed from the database in order, rendered in
+        batches of REPORT_BATCH_SIZE concurrent documents and appended to
+        the bundle, so only one batch is held in memory.
+
+        Args:
+            params (Dict[str, Any]):
+                Optional equipment_id (int or list) to restrict the report.
+            filename (str):
+                The bundle name, without extension.
+
+        Returns:
+            str: The S3 key of the uploaded zip bundle.
+        """
+        start = perf_counter()
+        route = f"/tmp/{filename}_{generate_hash_from_date()}.zip"
+        documents = total_bytes = 0
+
+        try:
+            with ZipFile(route, "w", ZIP_DEFLATED) as bundle:
+                for batch in self._batches(self._equipment_histories(params)):
+                    pdfs = self.pdf_generator.render_pdf_batch(
+                        REPORT_TEMPLATE, [content for _, content in batch]
+                    )
+                    for (name, _), pdf in zip(batch, pdfs):
+                        bundle.writestr(name, pdf)
+                        documents += 1
+                        total_bytes += len(pdf)
+
+            render_seconds = perf_counter() - start
+            s3_key = f"{REPORT_ROUTE}{os.path.basename(route)}"
+            # Multipart above the transfer threshold
+            S3Manager().client.upload_file(
+                route, self.bucket_name, s3_key, Config=transfer_config
+            )
+            bundle_bytes = os.path.getsize(route)
+        finally:
+            if os.path.exists(route):
+                os.remove(route)
+
+        seconds = perf_counter() - start
+        self.metrics = {
+            "documents": documents,
+            "pdf_bytes": total_bytes,
+            "bundle_bytes": bundle_bytes,
+            "render_seconds": round(render_seconds, 3),
+            "total_seconds": round(seconds, 3),
+            "documents_per_second": round(
+                documents / render_seconds if render_seconds else 0, 2
+            ),
+        }
+        print(f"Maintenance report metrics: {self.metrics}")
+
+        return s3_key
+
+    def _equipment_histories(
+        self, params: Dict[str, Any]
+    ) -> Iterator[tuple]:
+        """Yield (pdf name, template content) per equipment."""
+        stmt = (
+            select(
+                EquipmentModel.equipment_id,
+                EquipmentModel.description,
+                EquipmentModel.serial,
+                EquipmentModel.model,
+                MaintenanceStatusModel.description.label("status"),
+                MaintenanceStatusDetModel.user_id,
+                MaintenanceStatusDetModel.active,
+                MaintenanceStatusDetModel.created_at,
+            )
+            .join(
+                MaintenanceStatusDetModel,
+                MaintenanceStatusDetModel.equipment_id ==
+                EquipmentModel.equipment_id,
+            )
+            .join(
+                MaintenanceStatusModel,
+                MaintenanceStatusModel.maintenance_status_id ==
+                MaintenanceStatusDetModel.maintenance_status_id,
+            )
+            .where(EquipmentModel.active == ACTIVE)
+            .order_by(
+                EquipmentModel.equipment_id,
+                MaintenanceStatusDetModel.created_at,
+            )
+        )
+
+        equipment_id = params.get("equipment_id")
+        if equipment_id:
+            ids = equipment_id if type(equipment_id) is list else [
+                equipment_id
+            ]
+            stmt = stmt.where(EquipmentModel.equipment_id.in_(ids))
+
+        rows = self.db.stream(stmt)
+        for equipment_id, history in groupby(
+            rows, key=lambda row: row["equipment_id"]
+        ):
+            history = list(history)
+            equipment = history[0]
+            content = {
+                "description": escape(str(equipment["description"])),
+                "serial": escape(str(equipment["serial"])),
+                "model": escape(str(equipment["model"])),
+                "rows": "".join(
+                    REPORT_ROW_TEMPLATE.format(
+                        created_at=escape(str(row["created_at"])),
+                        status=escape(str(row["status"])),
+                        user_id=row["user_id"],
+                        active="Sí" if row["active"] == ACTIVE else "No",
+                    )
+                    for row in history
+                ),
+            }
+            yield f"mantenimiento_equipo_{equipment_id}.pdf", content
+
+    @staticmethod
+    def _batches(items: Iterator[tuple]) -> Iterator[List[tuple]]:
+        items = iter(items)
+        while True:
+            batch = list(islice(items, REPORT_BATCH_SIZE))
+            if not batch:
+                return
+            yield batch
@@ -1,5 +1,6 @@
 from typing import Any, Dict
 from sqlalchemy import update, insert, select, and_
+from sqlalchemy.sql import Select
 from Models.Equipment import EquipmentModel
 from Models.MaintenanceStatus import MaintenanceStatusModel
 from Models.MaintenanceStatusCab import MaintenanceStatusCabModel
@@ -43,13 +44,30 @@ class MaintenanceStatus:
                 Filtered maintenance status data.
         """
         request = get_input_data(event)
-        conditions = {"active": ACTIVE, **request}
-        equipment_id = request.get("equipment_id", 0)
+        stmt = self.maintenance_status_stmt(request)
+
+        # Execute query
+        maintenance_status = self.db.query(stmt)
+        return (
+            _response(maintenance_status.as_dict(), SUCCESS_STATUS)
+            if maintenance_status
+            else _response({}, NO_DATA_STATUS)
+        )
+
+    @staticmethod
+    def maintenance_status_stmt(request: Dict[str, Any]) -> Select:
+        """
+        Build the maintenance status query statement.
 
-        if equipment_id:
-            conditions.append({"equipment_id": equipment_id})
+        Args:
+            request (Dict[str, Any]):
+                The filters to apply, e.g. equipment_id.
+
+        Returns:
+            Select: The maintenance status select statement.
+        """
+        conditions = {"active": ACTIVE, **request}
 
-        # Query statement
         stmt = (
             select(
                 MaintenanceStatusCabModel,
@@ -89,13 +107,7 @@ class MaintenanceStatus:
             )
         )
 
-        # Execute query
-        maintenance_status = self.db.query(stmt)
-        return (
-            _response(maintenance_status.as_dict(), SUCCESS_STATUS)
-            if maintenance_status
-            else _response({}, NO_DATA_STATUS)
-        )
+        return stmt
 
     def change_maintenance_status(
         self, event: Dict[str, Any]
@@ -11,6 +11,7 @@ from Utils.Constants import (
     NO_DATA_STATUS,
 )
 from Utils.Validations import Validations
+from Utils.Auth.Passwords import cvc_hasher
 from Utils.GeneralTools import get_input_data, encrypt_field
 from Utils.ExceptionsTools import CustomException
 
@@ -58,7 +59,7 @@ class PaymentCard:
         }
 
         payment_card_data.update({
-            "cvc": encrypt_field(payment_card_data["cvc"])
+            "cvc": encrypt_field(payment_card_data["cvc"], cvc_hasher)
         })
 
         stmt = insert(PaymentCardModel).values(**payment_card_data)
@@ -86,7 +87,7 @@ class PaymentCard:
         )
 
         if request.get("cvc"):
-            request["cvc"] = encrypt_field(request["cvc"])
+            request["cvc"] = encrypt_field(request["cvc"], cvc_hasher)
 
         updated_values = {
             key: value for key, value in request.items()
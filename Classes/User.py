@@ -1,16 +1,18 @@
 import os
 import uuid
+import jwt
+from datetime import datetime, timedelta
 from typing import Any, Dict
 from sqlalchemy.sql import func
 from sqlalchemy.orm import aliased
 from sqlalchemy import insert, select, update, and_
-from Models.Address import AddressModel
+from Classes.Auth import Auth
 from Models.City import CityModel
 from Models.DocumentType import DocumentTypeModel
 from Models.Gender import GenderModel
 from Models.State import StateModel
 from Models.User import UserModel
-from Utils.Auth.Authorization import TokenTools
+from Utils.Auth.Authorization import TokenTools, invalidate_user_info
 from Utils.Constants import (
     ACTIVE,
     INACTIVE,
@@ -23,9 +25,20 @@ from Utils.Constants import (
 from Utils.ExceptionsTools import CustomException
 from Utils.GeneralTools import get_input_data, encrypt_field
 from Utils.QueryTools import all_columns_excluding
-from Utils.S3Manager import S3Manager
+from Utils.S3Manager import IMAGE_VARIANTS, S3Manager
 from Utils.Validations import Validations
 
+PROFILE_IMG_ROUTE = "profile_imgs/"
+PROFILE_IMG_TYPES = {
+    "image/jpeg": "jpg",
+    "image/png": "png",
+    "image/gif": "gif",
+    "image/webp": "webp",
+}
+# Upload tokens tie a profile_img_key to the policy that issued it
+PROFILE_IMG_TOKEN_AUDIENCE = "profile_img_upload"
+PROFILE_IMG_TOKEN_HOURS = 1
+
 
 class User:
     "Class to manage user operations."
@@ -34,6 +47,7 @@ class User:
         self.db = db
         self.bucket_name = os.getenv("BUCKET_NAME")
         self.s3_manager = S3Manager()
+        self.secret_key = os.getenv("SECRET_KEY")
         self.validations = Validations(db)
         self.fields = {
             "first_name": str, "last_name": str, "username": str,
@@ -65,6 +79,90 @@ class User:
             as_dict=True,
         )
 
+    def _upload_profile_img(self, profile_img: str) -> str:
+        """
+        Upload a base64 profile image and return its S3 key.
+
+        Args:
+            profile_img (str):
+            The base64 image, optionally prefixed with its data URL header.
+
+        Returns:
+            str: The S3 key of the uploaded image.
+
+        Raises:
+            CustomException:
+            If the image is not valid or could not be uploaded.
+        """
+        uploaded = self.s3_manager.upload_base64_file(
+            self.bucket_name,
+            f"profile_img_{uuid.uuid4()}.jpg",
+            profile_img,
+            PROFILE_IMG_ROUTE,
+        )
+
+        if not uploaded["statusCode"]:
+            raise CustomException(
+                uploaded["data"]["error"], int(uploaded["statusCode"])
+            )
+
+        return uploaded["data"]["s3_route"]
+
+    def _validate_profile_img_key(
+        self, profile_img_key: str, upload_token: str, user_id: int = None
+    ) -> str:
+        """
+        Validate a profile image key uploaded through a presigned POST.
+
+        Args:
+            profile_img_key (str):
+            The S3 key returned by profile_img_upload_url.
+            upload_token (str):
+            The upload_token returned with the key.
+            user_id (int, optional):
+            The user being updated, None on registration.
+
+        Returns:
+            str: The validated key.
+
+        Raises:
+            CustomException:
+            If the key was not issued with upload_token, is a resized
+            variant, belongs to another user or the object was not
+            uploaded.
+        """
+        try:
+            claims = jwt.decode(
+                upload_token or "",
+                self.secret_key,
+                algorithms=["HS256"],
+                audience=PROFILE_IMG_TOKEN_AUDIENCE,
+            )
+        except jwt.InvalidTokenError:
+            claims = {}
+
+        if (
+            claims.get("key") != profile_img_key
+            or not str(profile_img_key).startswith(PROFILE_IMG_ROUTE)
+            or S3Manager.is_variant_key(profile_img_key)
+            or self._profile_img_in_use(profile_img_key, user_id)
+            or not self.s3_manager.file_exists(
+                self.bucket_name, profile_img_key
+            )
+        ):
+            raise CustomException("La imagen de perfil no es válida.")
+
+        return profile_img_key
+
+    def _profile_img_in_use(self, profile_img: str, user_id: int) -> bool:
+        """True if a user other than user_id has profile_img."""
+        stmt = select(UserModel.user_id).where(
+            UserModel.profile_img == profile_img
+        )
+        if user_id:
+            stmt = stmt.where(UserModel.user_id != user_id)
+        return bool(self.db.query(stmt.limit(1)).as_dict())
+
     def _check_username_availability(self, username: str) -> None:
         """
         Check if the username is available.
@@ -112,7 +210,19 @@ class User:
             Dict[str, Any]:
             Filtered user data.
         """
-        conditions = {"active": ACTIVE, **get_input_data(event)}
+        request = get_input_data(event)
+        # Lists show avatars, so they get thumbnails unless asked otherwise
+        image_size = request.pop(
+            "image_size", "original" if "user_id" in request else "thumbnail"
+        )
+
+        if image_size not in IMAGE_VARIANTS:
+            raise CustomException(
+                f"Tamaño de imagen inválido. Valores permitidos: "
+                f"{', '.join(IMAGE_VARIANTS)}"
+            )
+
+        conditions = {"active": ACTIVE, **request}
         conditions = {k: v for k, v in conditions.items() if v is not None}
 
         issue_state, issue_city = aliased(StateModel), aliased(CityModel)
@@ -127,13 +237,12 @@ class User:
             DocumentTypeModel.description.label("document_type"),
             issue_city.city_name.label("city_of_issue"),
             issue_state.state_name.label("state_of_issue"),
-        ).distinct(UserModel.user_id).filter_by(**conditions)
+        ).filter_by(**conditions)
 
         join_conditions = [
             (GenderModel, GenderModel.gender_id == UserModel.gender_id),
             (DocumentTypeModel,
              DocumentTypeModel.document_type_id == UserModel.document_type_id),
-            (AddressModel, AddressModel.user_id == UserModel.user_id),
             (issue_state, UserModel.state_of_issue_id == issue_state.state_id),
             (issue_city, UserModel.city_of_issue_id == issue_city.city_id),
         ]
@@ -150,23 +259,76 @@ class User:
         else:
             user_info = query_result or []
 
-        def process_profile_image(user):
-            if user and user.get("profile_img"):
-                user["profile_img"] = self.s3_manager.presigned_download_file(
-                    self.bucket_name, user["profile_img"]
-                ).get("data", {}).get("url")
+        users = user_info if isinstance(user_info, list) else [user_info]
+        users = [user for user in users if user and user.get("profile_img")]
 
-        if isinstance(user_info, list):
-            for user in user_info:
-                process_profile_image(user)
-        else:
-            process_profile_image(user_info)
+        if users:
+            keys = self.s3_manager.resolve_variant_keys(
+                self.bucket_name,
+                (user["profile_img"] for user in users),
+                image_size,
+            )
+            urls = self.s3_manager.presigned_download_files(
+                self.bucket_name, keys.values()
+            )
+            for user in users:
+                user["profile_img"] = urls.get(keys[user["profile_img"]])
 
         status_code = SUCCESS_STATUS if user_info else NO_DATA_STATUS
         data = user_info if user_info else "No se encontraron datos."
 
         return {"statusCode": status_code, "data": data}
 
+    def profile_img_upload_url(
+        self, event: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Issue a presigned POST policy to upload a profile image directly
+        to S3.
+
+        Args:
+            event (Dict[str, Any]):
+            The event data containing the image content_type.
+
+        Returns:
+            Dict[str, Any]:
+            The upload url, the form fields to send, the object key to use
+            as profile_img_key in /create_user or /update_user and the
+            upload_token to send with it as profile_img_token.
+        """
+        content_type = get_input_data(event).get("content_type", "")
+        extension = PROFILE_IMG_TYPES.get(content_type)
+
+        if not extension:
+            raise CustomException(
+                "Tipo de imagen no permitido. Tipos permitidos: "
+                f"{', '.join(PROFILE_IMG_TYPES)}"
+            )
+
+        presigned_post = self.s3_manager.presigned_upload_file(
+            self.bucket_name,
+            f"{PROFILE_IMG_ROUTE}profile_img_{uuid.uuid4()}.{extension}",
+            content_type,
+        )
+
+        if not presigned_post["statusCode"]:
+            raise CustomException(
+                presigned_post["data"]["error"], ERROR_STATUS
+            )
+
+        presigned_post["data"]["upload_token"] = jwt.encode(
+            {
+                "key": presigned_post["data"]["key"],
+                "aud": PROFILE_IMG_TOKEN_AUDIENCE,
+                "exp": datetime.utcnow()
+                + timedelta(hours=PROFILE_IMG_TOKEN_HOURS),
+            },
+            self.secret_key,
+            algorithm="HS256",
+        )
+
+        return {"statusCode": SUCCESS_STATUS, "data": presigned_post["data"]}
+
     def register_user(self, event: Dict[str, Any]) -> Dict[str, Any]:
         """
         Creates a new user in the database.
@@ -190,13 +352,12 @@ class User:
 
         profile_img = request.get("profile_img")
 
-        if profile_img:
-            profile_img = self.s3_manager.upload_base64_file(
-                self.bucket_name,
-                f"profile_img_{uuid.uuid4()}.jpg",
-                profile_img.split(",")[1],
-                "profile_imgs/",
-            )["data"]["s3_route"]
+        if request.get("profile_img_key"):
+            profile_img = self._validate_profile_img_key(
+                request["profile_img_key"], request.get("profile_img_token")
+            )
+        elif profile_img:
+            profile_img = self._upload_profile_img(profile_img)
 
         user_data = {
             key: request[key]
@@ -239,12 +400,16 @@ class User:
 
         self._validate_user_exists(user_id)
 
-        if "profile_img" in request:
-            request["profile_img"] = self.s3_manager.upload_base64_file(
-                self.bucket_name,
-                f"profile_img_{uuid.uuid4()}.jpg",
-                request.pop("profile_img"),
-                "profile_imgs/",
+        profile_img_key = request.pop("profile_img_key", None)
+        profile_img_token = request.pop("profile_img_token", None)
+
+        if profile_img_key:
+            request["profile_img"] = self._validate_profile_img_key(
+                profile_img_key, profile_img_token, user_id
+            )
+        elif request.get("profile_img"):
+            request["profile_img"] = self._upload_profile_img(
+                request["profile_img"]
             )
 
         if request.get("password"):
@@ -274,6 +439,9 @@ class User:
             .where(UserModel.user_id == user_id, UserModel.active == ACTIVE)
             .values(**update_values)
         )
+        invalidate_user_info(user_id)
+        if is_updated and "password" in update_values:
+            Auth(self.db).revoke_user_tokens(user_id)
 
         return {
             "statusCode": SUCCESS_STATUS if is_updated else ERROR_STATUS,
@@ -308,6 +476,9 @@ class User:
             )
             .values(active=INACTIVE)
         )
+        invalidate_user_info(user_id)
+        if is_deleted:
+            Auth(self.db).revoke_user_tokens(user_id)
 
         return {
             "statusCode": SUCCESS_STATUS if is_deleted else ERROR_STATUS,
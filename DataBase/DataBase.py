@@ -4,7 +4,11 @@ import pymysql
 from sqlalchemy.dialects import mysql
 from sqlalchemy.exc import SQLAlchemyError
 from DataBase.Layer import Layer
-from collections.abc import Iterable
+from DataBase.QueryStats import QueryStats
+from DataBase.SlowQueryLog import SlowQueryLog
+from Utils.Tracing import NOOP_SPAN, add_span, is_tracing, span
+from collections.abc import Iterable, Iterator
+from time import perf_counter
 from typing import Tuple
 
 pymysql.install_as_MySQLdb()
@@ -31,14 +35,19 @@ class DataBase:
         self._port = int(DB_PORT)
         self._dbname = DB_NAME
         self._engine = DB_ENGINE
+        self.stats = QueryStats()
+        self.slow_query_log = SlowQueryLog()
 
     @property
     def db_name(self):
         """Property db_name."""
         return self._dbname
 
-    def connect(self) -> None:
-        """Method for connect to database."""
+    def connect(
+        self, cursorclass=pymysql.cursors.DictCursor, record: bool = True
+    ) -> None:
+        """Method for connect to database. Connections made with
+        record=False (diagnostics) are left out of stats and traces."""
         connect = False
         try:
             # Fix decimal cast
@@ -46,22 +55,25 @@ class DataBase:
             conversions[pymysql.converters.FIELD_TYPE.DECIMAL] = float
             conversions[pymysql.converters.FIELD_TYPE.NEWDECIMAL] = float
 
-            connect = pymysql.connect(
-                host=self._host,
-                port=self._port,
-                user=self._username,
-                passwd=self._password,
-                db=self._dbname,
-                cursorclass=pymysql.cursors.DictCursor,
-                charset="utf8mb4",
-                conv=conversions,
-            )
+            with span("db.connect") if record else NOOP_SPAN:
+                connect = pymysql.connect(
+                    host=self._host,
+                    port=self._port,
+                    user=self._username,
+                    passwd=self._password,
+                    db=self._dbname,
+                    cursorclass=cursorclass,
+                    charset="utf8mb4",
+                    conv=conversions,
+                )
 
         except pymysql.Error as e:
             print("Error: connect pymysql %d: %s" %
                   (e.args[0], e.args[1]))
             raise SQLAlchemyError(e)
 
+        if record:
+            self.stats.connections += 1
         return connect
 
     @classmethod
@@ -79,13 +91,28 @@ class DataBase:
         else:
             return statement, data
 
+    def _record(
+        self, stmt, sql: str, data: Iterable, rows: int, seconds: float
+    ) -> None:
+        """Record an executed statement in stats and the slow query log."""
+        self.stats.record(sql, rows, seconds)
+        self.slow_query_log.record(self, stmt, sql, data, rows, seconds)
+        if is_tracing():
+            add_span(
+                "db.query",
+                seconds,
+                **{"db.statement": QueryStats.shape(sql), "db.rows": rows},
+            )
+
     def execute(self, sql: str) -> None:
         """Method for execute queries in pymysql."""
         self._conn = self.connect()
         with self._conn:
             with self._conn.cursor() as cursor:
                 try:
+                    start = perf_counter()
                     cursor.execute(sql)
+                    self._record(sql, sql, (), 0, perf_counter() - start)
                 except pymysql.Error as e:
                     print("Error: execute pymysql %d: %s" %
                           (e.args[0], e.args[1]))
@@ -110,6 +137,7 @@ class DataBase:
         with self._conn:
             with self._conn.cursor() as cursor:
                 try:
+                    start = perf_counter()
                     cursor.execute(sql, data)
                     if one:
                         resp = cursor.fetchone()
@@ -117,6 +145,13 @@ class DataBase:
                         resp = cursor.fetchmany(size)
                     else:
                         resp = cursor.fetchall()
+                    self._record(
+                        stmt,
+                        sql,
+                        data,
+                        (1 if type(resp) is dict else len(resp or ())),
+                        perf_counter() - start,
+                    )
                 except pymysql.Error as e:
                     print("Error: query pymysql %d: %s" %
                           (e.args[0], e.args[1]))
@@ -124,6 +159,37 @@ class DataBase:
         # print(f'!query output: {resp}')
         return resp
 
+    def stream(
+        self, stmt: str, data: Iterable = (), size: int = 1000
+    ) -> Iterator[dict]:
+        """Method for iterate select statements with a server side cursor.
+
+        Rows are fetched from MySQL in batches of size as they are consumed,
+        so the full result set is never held in memory.
+        """
+        sql, data = self.compile_sql(stmt, data)
+        conn = self.connect(cursorclass=pymysql.cursors.SSDictCursor)
+
+        with conn:
+            with conn.cursor() as cursor:
+                try:
+                    start = perf_counter()
+                    cursor.execute(sql, data)
+                    rows = cursor.fetchmany(size)
+                    seconds = perf_counter() - start
+                    total = 0
+                    while rows:
+                        total += len(rows)
+                        yield from rows
+                        start = perf_counter()
+                        rows = cursor.fetchmany(size)
+                        seconds += perf_counter() - start
+                    self._record(stmt, sql, data, total, seconds)
+                except pymysql.Error as e:
+                    print("Error: stream pymysql %d: %s" %
+                          (e.args[0], e.args[1]))
+                    raise SQLAlchemyError(e)
+
     def add(self, stmt: str, data: Iterable = (), many: bool = False) -> int:
         """Method for execute insert statements."""
         result_id = 0
@@ -133,9 +199,15 @@ class DataBase:
         with self._conn:
             with self._conn.cursor() as cursor:
                 try:
+                    start = perf_counter()
                     cursor.execute(sql, data)
                     result_id = cursor.rowcount if many else cursor.lastrowid
                     self._conn.commit()
+                    self.stats.commits += 1
+                    self._record(
+                        stmt, sql, data, cursor.rowcount,
+                        perf_counter() - start,
+                    )
                 except pymysql.Error as e:
                     print("Error: insert pymysql %d: %s" %
                           (e.args[0], e.args[1]))
@@ -151,9 +223,14 @@ class DataBase:
         with self._conn:
             with self._conn.cursor() as cursor:
                 try:
+                    start = perf_counter()
                     cursor.execute(sql, data)
                     self._conn.commit()
                     row_count = cursor.rowcount
+                    self.stats.commits += 1
+                    self._record(
+                        stmt, sql, data, row_count, perf_counter() - start
+                    )
                 except pymysql.Error as e:
                     print("Error: update pymysql %d: %s" %
                           (e.args[0], e.args[1]))
@@ -169,9 +246,14 @@ class DataBase:
         with self._conn:
             with self._conn.cursor() as cursor:
                 try:
+                    start = perf_counter()
                     cursor.execute(sql, data)
                     self._conn.commit()
                     row_count = cursor.rowcount
+                    self.stats.commits += 1
+                    self._record(
+                        stmt, sql, data, row_count, perf_counter() - start
+                    )
                 except pymysql.Error as e:
                     print("Error: delete pymysql %d: %s" %
                           (e.args[0], e.args[1]))
@@ -0,0 +1,92 @@
+from os import environ
+from re import compile as re_compile
+from collections import Counter
+from json import dumps as json_dumps
+
+# Max statements per request, 0 disables the budget
+QUERY_BUDGET = int(environ.get("QUERY_BUDGET", 0))
+# Raise QueryBudgetExceeded instead of only flagging it (tests)
+QUERY_BUDGET_STRICT = environ.get("QUERY_BUDGET_STRICT", "0") == "1"
+# Executions of the same statement shape flagged as N+1
+N_PLUS_ONE_THRESHOLD = int(environ.get("N_PLUS_ONE_THRESHOLD", 3))
+# Print the summary of every request
+QUERY_STATS_LOG = environ.get("QUERY_STATS_LOG", "1") == "1"
+
+# Expanded IN lists "(%s, %s, %s)" count as the same shape
+_IN_LIST = re_compile(r"\(\s*%s(?:\s*,\s*%s)*\s*\)")
+_SPACES = re_compile(r"\s+")
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised when a request runs more statements than its budget."""
+
+
+class QueryStats:
+    """Counters of the statements executed by a DataBase instance."""
+
+    def __init__(self, handler: str = ""):
+        """Constructor defined for the instance of class."""
+        self.handler = handler
+        self.queries = 0
+        self.connections = 0
+        self.commits = 0
+        self.rows = 0
+        self.seconds = 0.0
+        self.shapes = Counter()
+
+    @staticmethod
+    def shape(sql: str) -> str:
+        """Normalized statement, equal for executions differing in values."""
+        return _IN_LIST.sub("(%s...)", _SPACES.sub(" ", sql).strip())
+
+    @property
+    def round_trips(self) -> int:
+        """Connections, statements and commits sent to the server."""
+        return self.connections + self.queries + self.commits
+
+    def record(self, sql: str, rows: int, seconds: float) -> None:
+        """Record one executed statement."""
+        self.queries += 1
+        self.rows += rows
+        self.seconds += seconds
+        self.shapes[self.shape(sql)] += 1
+
+    def n_plus_one(self) -> dict:
+        """Statement shapes repeated at least N_PLUS_ONE_THRESHOLD times."""
+        return {
+            shape: count for shape, count in self.shapes.items()
+            if count >= N_PLUS_ONE_THRESHOLD
+        }
+
+    def over_budget(self, budget: int = None) -> bool:
+        budget = QUERY_BUDGET if budget is None else budget
+        return bool(budget) and self.queries > budget
+
+    def check_budget(self, budget: int = None) -> None:
+        """
+        Raises QueryBudgetExceeded if more statements than budget
+        (defaults to QUERY_BUDGET) were executed.
+        """
+        if self.over_budget(budget):
+            raise QueryBudgetExceeded(
+                f"{self.handler or 'request'} executed {self.queries} "
+                f"queries, budget is {budget or QUERY_BUDGET}"
+            )
+
+    def summary(self) -> dict:
+        """Summary of the request, as logged by emit."""
+        return {
+            "handler": self.handler,
+            "queries": self.queries,
+            "round_trips": self.round_trips,
+            "connections": self.connections,
+            "rows": self.rows,
+            "ms": round(self.seconds * 1000, 2),
+            "over_budget": self.over_budget(),
+            "n_plus_one": self.n_plus_one(),
+        }
+
+    def emit(self) -> None:
+        """Print the summary as a structured log line."""
+        if QUERY_STATS_LOG and self.queries:
+            print(json_dumps({"query_stats": self.summary()}))
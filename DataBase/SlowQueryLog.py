@@ -0,0 +1,141 @@
+from os import environ
+from re import compile as re_compile, IGNORECASE
+from json import dumps as json_dumps, loads as json_loads
+from typing import Any, Callable, Iterable, List, Optional
+from pymysql.converters import escape_item
+from DataBase.QueryStats import QueryStats
+
+# Statements taking at least this many milliseconds are logged, 0 disables
+SLOW_QUERY_MS = float(environ.get("SLOW_QUERY_MS", 500))
+# Attach the EXPLAIN FORMAT=JSON plan of slow SELECT statements
+SLOW_QUERY_EXPLAIN = environ.get("SLOW_QUERY_EXPLAIN", "0") == "1"
+
+# Parameters bound to these columns are never logged
+SECRET_PARAMS = re_compile(
+    r"pass|token|secret|cvc|expiry|^number", IGNORECASE
+)
+REDACTED = "'***'"
+
+
+def print_slow_query(entry: dict) -> None:
+    """Default sink, one JSON line per slow statement."""
+    print(json_dumps({"slow_query": entry}, default=str))
+
+
+class SlowQueryLog:
+    """Logs the statements of a DataBase instance slower than a threshold."""
+
+    def __init__(
+        self,
+        threshold_ms: float = SLOW_QUERY_MS,
+        explain: bool = SLOW_QUERY_EXPLAIN,
+        sink: Callable[[dict], Any] = print_slow_query,
+    ):
+        """Constructor defined for the instance of class."""
+        self.threshold_ms = threshold_ms
+        self.explain = explain
+        self.sink = sink
+
+    def is_slow(self, seconds: float) -> bool:
+        return bool(self.threshold_ms) and (
+            seconds * 1000 >= self.threshold_ms
+        )
+
+    def record(
+        self,
+        db,
+        stmt: Any,
+        sql: str,
+        data: Iterable,
+        rows: int,
+        seconds: float,
+    ) -> None:
+        """
+        Sends the statement to the sink when it is slow.
+
+        Args:
+            db (DataBase): Instance that executed the statement, used to
+                run EXPLAIN.
+            stmt: The statement as received (sqlalchemy or raw sql).
+            sql (str): The compiled sql.
+            data (Iterable): The parameters sent with sql.
+            rows (int): Rows returned or affected.
+            seconds (float): Execution time.
+        """
+        if not self.is_slow(seconds):
+            return
+
+        params = self.redacted_params(stmt, data)
+        entry = {
+            "handler": db.stats.handler,
+            "ms": round(seconds * 1000, 2),
+            "rows": rows,
+            "shape": QueryStats.shape(sql),
+            "sql": self.render(sql, params),
+            "params": params,
+        }
+        if self.explain and sql.lstrip()[:6].upper() == "SELECT":
+            entry["explain"] = self.explain_plan(db, sql, data)
+
+        self.sink(entry)
+
+    @staticmethod
+    def param_names(stmt: Any) -> Optional[List[str]]:
+        """Bound parameter names of a sqlalchemy statement, in the order
+        used by DataBase.compile_sql. None for raw sql."""
+        if isinstance(stmt, str):
+            return None
+        from sqlalchemy.dialects import mysql
+
+        compiled = stmt.compile(
+            dialect=mysql.dialect(),
+            compile_kwargs={"render_postcompile": True},
+        )
+        return list(compiled.params.keys())
+
+    @classmethod
+    def redacted_params(cls, stmt: Any, data: Iterable) -> Optional[list]:
+        """
+        Parameters as sql literals, with secrets replaced by REDACTED.
+
+        Raw sql parameters can't be matched with a column, so they are not
+        logged at all and None is returned.
+        """
+        names = cls.param_names(stmt)
+        if names is None:
+            return None
+
+        data = list(data or ())
+        if data and isinstance(data[0], (list, tuple)):
+            # executemany, the rows don't add anything to find an index
+            return None
+
+        return [
+            REDACTED if SECRET_PARAMS.search(name)
+            else escape_item(value, "utf8mb4")
+            for name, value in zip(names, data)
+        ]
+
+    @staticmethod
+    def render(sql: str, params: Optional[list]) -> str:
+        """Statement with the parameters inlined, as print_query does."""
+        if params is None:
+            return sql
+        try:
+            return sql % tuple(params)
+        except (TypeError, ValueError):
+            return sql
+
+    @staticmethod
+    def explain_plan(db, sql: str, data: Iterable) -> Any:
+        """Runs EXPLAIN FORMAT=JSON for sql in a new connection, not
+        counted in the stats of db."""
+        try:
+            conn = db.connect(record=False)
+            with conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(f"EXPLAIN FORMAT=JSON {sql}", data)
+                    plan = cursor.fetchone() or {}
+            return json_loads(plan.get("EXPLAIN", "null"))
+        except Exception as e:
+            return {"error": str(e)}
@@ -10,3 +10,13 @@ def auth(event, context, conn):
 
     method_to_be_executed = methods.get(event["httpMethod"])
     return method_to_be_executed(event)
+
+
+@authorized
+def refresh_token(event, context, conn):
+    auth_class = Auth(conn)
+
+    methods = {"POST": auth_class.refresh, "DELETE": auth_class.revoke}
+
+    method_to_be_executed = methods.get(event["httpMethod"])
+    return method_to_be_executed(event)
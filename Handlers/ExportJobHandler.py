@@ -0,0 +1,21 @@
+from Classes.ExportJob import ExportJob
+from DataBase.DataBase import DataBase
+from Utils.EventTools import authorized
+
+
+@authorized
+def export_job(event, context, conn):
+    export_job_class = ExportJob(conn)
+
+    methods = {
+        "GET": export_job_class.get_export_job,
+        "POST": export_job_class.create_export_job,
+    }
+
+    method_to_be_executed = methods.get(event["httpMethod"])
+    return method_to_be_executed(event)
+
+
+def export_worker(event, context):
+    """Asynchronous worker, invoked with {"export_job_id": ...}."""
+    return ExportJob(DataBase()).run_export_job(event["export_job_id"])
@@ -0,0 +1,34 @@
+from urllib.parse import unquote_plus
+from PIL import UnidentifiedImageError
+from Utils.ImageTools import IMAGE_ROUTES, create_image_variants
+from Utils.S3Manager import S3Manager
+
+
+def image_variants(event, context):
+    """
+    Creates resized variants of uploaded images. Triggered by S3 uploads,
+    it can also be invoked with {"bucket": ..., "keys": [...]} to backfill
+    images uploaded before variants existed.
+    """
+    s3_manager = S3Manager()
+
+    objects = [
+        (record["s3"]["bucket"]["name"],
+         unquote_plus(record["s3"]["object"]["key"]))
+        for record in event.get("Records", [])
+    ]
+    objects += [(event["bucket"], key) for key in event.get("keys", [])]
+
+    result = {}
+    for bucket, key in objects:
+        if not key.startswith(IMAGE_ROUTES) or S3Manager.is_variant_key(key):
+            continue
+
+        try:
+            result[key] = create_image_variants(bucket, key, s3_manager)
+        # OSError: truncated or corrupt images
+        except (ValueError, UnidentifiedImageError, OSError) as e:
+            print(f"Error: image variants {key}: {str(e)}")
+            result[key] = {"error": str(e)}
+
+    return result
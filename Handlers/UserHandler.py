@@ -27,6 +27,16 @@ def user_data_by_token(event, context, conn):
     return method_to_be_executed(event)
 
 
+@authorized
+def profile_img_upload_url(event, context, conn):
+    user_class = User(conn)
+
+    methods = {"GET": user_class.profile_img_upload_url}
+
+    method_to_be_executed = methods.get(event["httpMethod"])
+    return method_to_be_executed(event)
+
+
 @authorized
 def change_password(event, context, conn):
     user_class = User(conn)
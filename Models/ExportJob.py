@@ -0,0 +1,29 @@
+from sqlalchemy.sql.functions import current_timestamp
+from sqlalchemy import Column, Integer, String, DateTime, Text
+from sqlalchemy.ext.declarative import declarative_base
+
+Base = declarative_base()
+
+
+class ExportJobModel(Base):
+    __tablename__ = "export_jobs"
+    export_job_id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, nullable=False, index=True)
+    export_type = Column(String(100), nullable=False)
+    file_format = Column(String(20), nullable=False)
+    params = Column(Text, nullable=True)
+    status = Column(String(20), nullable=False, server_default="pending")
+    s3_key = Column(Text, nullable=True)
+    error = Column(Text, nullable=True)
+    active = Column(Integer, server_default=str(1), index=True)
+    created_at = Column(DateTime, default=current_timestamp())
+    updated_at = Column(
+        DateTime, default=current_timestamp(), onupdate=current_timestamp()
+    )
+
+    def __init__(self, **kwargs):
+        self.user_id = kwargs.get("user_id")
+        self.export_type = kwargs.get("export_type")
+        self.file_format = kwargs.get("file_format")
+        self.params = kwargs.get("params")
+        self.status = kwargs.get("status", "pending")
@@ -0,0 +1,25 @@
+from sqlalchemy.sql.functions import current_timestamp
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.ext.declarative import declarative_base
+
+Base = declarative_base()
+
+
+class RefreshTokenModel(Base):
+    __tablename__ = "refresh_tokens"
+    refresh_token_id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, nullable=False, index=True)
+    # sha256 hex digest, the token itself is never stored
+    token_hash = Column(String(64), nullable=False, unique=True, index=True)
+    # Tokens rotated from the same login
+    family_id = Column(String(32), nullable=False, index=True)
+    expires_at = Column(DateTime, nullable=False)
+    revoked = Column(Integer, nullable=False, server_default=str(0))
+    created_at = Column(DateTime, default=current_timestamp())
+
+    def __init__(self, **kwargs):
+        self.user_id = kwargs.get("user_id")
+        self.token_hash = kwargs.get("token_hash")
+        self.family_id = kwargs.get("family_id")
+        self.expires_at = kwargs.get("expires_at")
+        self.revoked = kwargs.get("revoked", 0)
@@ -1,10 +1,29 @@
+import os
 from typing import Dict, Any
 from sqlalchemy import select, and_
 from Models.User import UserModel
 from Models.Role import RoleModel
+from Utils.CacheTools import TTLCache
 from Utils.Constants import ACTIVE, FORBIDDEN_STATUS
 from Utils.ExceptionsTools import CustomException
 
+# Seconds a user role lookup is reused. Kept short since other
+# containers can't be told about changes
+USER_INFO_CACHE_TTL = float(os.getenv("USER_INFO_CACHE_TTL", 30))
+
+user_info_cache = TTLCache(maxsize=1024, ttl=USER_INFO_CACHE_TTL)
+
+
+def invalidate_user_info(user_id: int = None) -> None:
+    """
+    Drops cached user info. Call it with the user_id after updating or
+    deleting a user, or without arguments after changing roles.
+    """
+    if user_id is None:
+        user_info_cache.clear()
+    else:
+        user_info_cache.pop(int(user_id))
+
 
 class TokenTools:
     """
@@ -42,6 +61,10 @@ class TokenTools:
         Raises:
             CustomException: If the user is not found or is inactive.
         """
+        user_info = user_info_cache.get(int(user_id))
+        if user_info is not None:
+            return dict(user_info)
+
         stmt = (
             select(
                 UserModel.user_id,
@@ -70,4 +93,6 @@ class TokenTools:
                 "Usuario no encontrado o inactivo.", FORBIDDEN_STATUS
             )
 
-        return results.as_dict()
+        user_info = results.as_dict()
+        user_info_cache.set(int(user_id), user_info)
+        return dict(user_info)
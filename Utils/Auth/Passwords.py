@@ -0,0 +1,88 @@
+import os
+import bcrypt
+from concurrent.futures import Future, ThreadPoolExecutor
+from re import compile as re_compile
+from threading import Lock
+from typing import Iterable, List, Tuple
+
+# bcrypt work factor of new hashes, each step doubles the cost
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+# Work factor of card CVC hashes, defaults to BCRYPT_ROUNDS
+CVC_BCRYPT_ROUNDS = int(os.getenv("CVC_BCRYPT_ROUNDS", BCRYPT_ROUNDS))
+# Threads verifying concurrently, bcrypt releases the GIL while hashing
+PASSWORD_MAX_WORKERS = int(os.getenv("PASSWORD_MAX_WORKERS", 4))
+
+# $2b$12$<salt and hash>, also the $2a$ and $2y$ variants
+_BCRYPT_HASH = re_compile(r"^\$2[aby]?\$(\d{2})\$")
+
+
+class PasswordHasher:
+    """bcrypt hashing with a configurable work factor."""
+
+    _executor: ThreadPoolExecutor = None
+    _executor_lock = Lock()
+
+    def __init__(self, rounds: int = BCRYPT_ROUNDS):
+        self.rounds = rounds
+
+    def hash(self, password: str) -> str:
+        return bcrypt.hashpw(
+            password.encode(), bcrypt.gensalt(rounds=self.rounds)
+        ).decode()
+
+    @staticmethod
+    def verify(password: str, hashed: str) -> bool:
+        """Compare password with a hash of any work factor."""
+        return bcrypt.checkpw(password.encode(), hashed.encode())
+
+    @staticmethod
+    def get_rounds(hashed: str) -> int:
+        """Work factor of a bcrypt hash, 0 if it isn't one."""
+        match = _BCRYPT_HASH.match(hashed or "")
+        return int(match.group(1)) if match else 0
+
+    def needs_rehash(self, hashed: str) -> bool:
+        """True if hashed was made with a work factor other than rounds."""
+        return self.get_rounds(hashed) != self.rounds
+
+    def verify_and_update(
+        self, password: str, hashed: str
+    ) -> Tuple[bool, str]:
+        """
+        Verify password and return a new hash when the work factor changed.
+
+        Returns:
+            Tuple[bool, str]: If the password is valid and the hash to
+                store instead of hashed, None if it doesn't need changes.
+        """
+        if not self.verify(password, hashed):
+            return False, None
+        return True, (
+            self.hash(password) if self.needs_rehash(hashed) else None
+        )
+
+    @classmethod
+    def executor(cls) -> ThreadPoolExecutor:
+        """Thread pool shared by the hashers of the process."""
+        if cls._executor is None:
+            with cls._executor_lock:
+                if cls._executor is None:
+                    cls._executor = ThreadPoolExecutor(
+                        max_workers=PASSWORD_MAX_WORKERS,
+                        thread_name_prefix="bcrypt",
+                    )
+        return cls._executor
+
+    def verify_async(self, password: str, hashed: str) -> Future:
+        """Verify in the thread pool, for long running workers."""
+        return self.executor().submit(self.verify, password, hashed)
+
+    def verify_many(self, pairs: Iterable[Tuple[str, str]]) -> List[bool]:
+        """Verify (password, hash) pairs concurrently, results in order."""
+        return list(
+            self.executor().map(lambda pair: self.verify(*pair), pairs)
+        )
+
+
+password_hasher = PasswordHasher()
+cvc_hasher = PasswordHasher(rounds=CVC_BCRYPT_ROUNDS)
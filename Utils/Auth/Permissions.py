@@ -0,0 +1,190 @@
+import os
+from threading import Lock
+from time import monotonic
+from typing import Dict, Optional
+from sqlalchemy import select
+from Models.Permission import PermissionModel
+from Models.RolePermission import RolePermissionModel
+from Utils.Auth.Authorization import TokenTools
+from Utils.Constants import ACTIVE, FORBIDDEN_STATUS
+from Utils.ExceptionsTools import CustomException
+
+# Seconds the role permissions are reused before reloading them
+PERMISSIONS_REFRESH_SECONDS = float(
+    os.getenv("PERMISSIONS_REFRESH_SECONDS", 300)
+)
+# Allow routes whose permission is not in the database (with a warning)
+# instead of denying them. On while the ROUTE_PERMISSIONS names have no
+# permissions/role_permissions rows, set it to "0" once they are seeded
+PERMISSIONS_ALLOW_UNDEFINED = (
+    os.getenv("PERMISSIONS_ALLOW_UNDEFINED", "1") == "1"
+)
+
+# Handlers callable without token
+PUBLIC_HANDLERS = frozenset((
+    "auth",
+    "refresh_token",
+    "user",
+    "profile_img_upload_url",
+    "gender",
+    "document_type",
+    "country",
+    "state",
+    "city",
+    "address",
+))
+
+# Permission name required by a handler, by "handler:METHOD" or by handler
+# for every method. Handlers not listed only require a valid token
+ROUTE_PERMISSIONS: Dict[str, str] = {
+    "management:GET": "management.read",
+    "management:POST": "management.write",
+    "management:PUT": "management.write",
+    "management:DELETE": "management.write",
+    "maintenance_status:GET": "maintenance.read",
+    "maintenance_status:POST": "maintenance.write",
+    "export_job": "export.create",
+}
+
+
+def route_permission(handler: str, http_method: str = "") -> Optional[str]:
+    """Permission name required by the handler and method, if any."""
+    return ROUTE_PERMISSIONS.get(
+        f"{handler}:{http_method}", ROUTE_PERMISSIONS.get(handler)
+    )
+
+
+class PermissionEngine:
+    """
+    Role permissions as bitmasks, bit permission_id set for each active
+    permission of the role. Checks are a dict lookup and a bit test, the
+    database is only read when the masks are older than refresh_seconds.
+    """
+
+    def __init__(
+        self,
+        refresh_seconds: float = PERMISSIONS_REFRESH_SECONDS,
+        allow_undefined: bool = PERMISSIONS_ALLOW_UNDEFINED,
+    ):
+        self.refresh_seconds = refresh_seconds
+        self.allow_undefined = allow_undefined
+        self.role_masks: Dict[int, int] = {}
+        self.permission_bits: Dict[str, int] = {}
+        self.loaded_at: Optional[float] = None
+        self._warned = set()
+        self._lock = Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self.loaded_at is not None
+
+    def is_stale(self) -> bool:
+        return (
+            self.loaded_at is None
+            or monotonic() - self.loaded_at >= self.refresh_seconds
+        )
+
+    def refresh(self, db) -> None:
+        """Reloads the permissions and role masks from the database."""
+        permissions = db.query(
+            select(
+                PermissionModel.permission_id,
+                PermissionModel.permission_name,
+            ).where(PermissionModel.active == ACTIVE)
+        ).as_dict()
+        permission_bits = {
+            row["permission_name"]: row["permission_id"]
+            for row in permissions
+        }
+
+        role_permissions = db.query(
+            select(
+                RolePermissionModel.role_id,
+                RolePermissionModel.permission_id,
+            ).where(RolePermissionModel.active == ACTIVE)
+        ).as_dict()
+        active_ids = set(permission_bits.values())
+        role_masks: Dict[int, int] = {}
+        for row in role_permissions:
+            if row["permission_id"] in active_ids:
+                role_masks[row["role_id"]] = (
+                    role_masks.get(row["role_id"], 0)
+                    | 1 << row["permission_id"]
+                )
+
+        with self._lock:
+            self.permission_bits = permission_bits
+            self.role_masks = role_masks
+            self.loaded_at = monotonic()
+
+    def ensure_fresh(self, db) -> None:
+        """
+        Refreshes the masks when stale. A failed refresh keeps the previous
+        masks, it's retried on the next call.
+        """
+        if not self.is_stale():
+            return
+        try:
+            self.refresh(db)
+        except Exception as e:
+            print(f"Permissions refresh failed: {e}")
+
+    def role_mask(self, role_id: int) -> int:
+        return self.role_masks.get(role_id, 0)
+
+    def has_permission(self, mask: int, permission_name: str) -> bool:
+        """
+        True if mask has permission_name. Always False while the masks were
+        never loaded. Permissions missing in the database are denied, or
+        allowed with a warning printed once per name if allow_undefined.
+        """
+        if not self.loaded:
+            return False
+
+        bit = self.permission_bits.get(permission_name)
+        if bit is None:
+            if permission_name not in self._warned:
+                self._warned.add(permission_name)
+                print(
+                    f"Warning: permission '{permission_name}' is not "
+                    "defined, access "
+                    f"{'allowed' if self.allow_undefined else 'denied'}."
+                )
+            return self.allow_undefined
+        return bool(mask >> bit & 1)
+
+    def check(
+        self, db, handler: str, http_method: str, claims: dict
+    ) -> None:
+        """
+        Raises a 403 CustomException if the token owner can't call the
+        handler. Routes requiring a permission are denied while the masks
+        can't be loaded.
+
+        Args:
+            db (DataBase): Used to refresh stale masks.
+            handler (str): The handler function name.
+            http_method (str): The request method.
+            claims (dict): The verified token claims. The role is read
+                from get_user_info (cached and invalidated on user updates)
+                rather than the token, so role changes apply right away.
+        """
+        permission = route_permission(handler, http_method)
+        if not permission:
+            return
+
+        self.ensure_fresh(db)
+        mask = 0
+        if self.loaded:
+            mask = self.role_mask(
+                TokenTools(db).get_user_info(claims["user_id"])["role_id"]
+            )
+
+        if not self.has_permission(mask, permission):
+            raise CustomException(
+                "No tiene permisos para realizar esta acción.",
+                FORBIDDEN_STATUS,
+            )
+
+
+permission_engine = PermissionEngine()
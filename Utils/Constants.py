@@ -3,6 +3,7 @@ ACTIVE = 1
 INACTIVE = 0
 CREATED_STATUS = 201
 SUCCESS_STATUS = 200
+ACCEPTED_STATUS = 202
 ERROR_STATUS = 400
 UNAUTHORIZED_STATUS = 401
 FORBIDDEN_STATUS = 403
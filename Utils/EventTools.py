@@ -1,24 +1,59 @@
 import os
 import jwt
+from hashlib import sha256
+from time import time
+from Utils.Auth.Permissions import PUBLIC_HANDLERS, permission_engine
+from Utils.CacheTools import TTLCache
 from Utils.Response import Response
 from Utils.ExceptionsTools import CustomException, get_and_print_error
 from sqlalchemy.exc import SQLAlchemyError, InvalidRequestError
 from DataBase.DataBase import DataBase
+from DataBase.QueryStats import QUERY_BUDGET_STRICT
+from Utils.Profiling import start_profiler, stop_profiler
+from Utils.Tracing import end_trace, span, start_trace
 
 
 SECRET_KEY = os.getenv("SECRET_KEY")
+# Verified tokens kept per container, each one until its exp claim
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", 1024))
+# Time to live of verified tokens without exp claim
+TOKEN_CACHE_TTL = float(os.getenv("TOKEN_CACHE_TTL", 300))
+
+token_cache = TTLCache(maxsize=TOKEN_CACHE_SIZE, ttl=TOKEN_CACHE_TTL)
+
+
+def decode_token(token: str) -> dict:
+    """
+    Verify token and return its claims. Verified tokens are cached by
+    their sha256 digest until they expire, so requests repeating a token
+    skip the signature check.
+    """
+    digest = sha256(token.encode("utf-8")).hexdigest()
+    claims = token_cache.get(digest)
+    if claims is not None:
+        return claims
+
+    claims = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
+    ttl = claims["exp"] - time() if "exp" in claims else TOKEN_CACHE_TTL
+    if ttl > 0:
+        token_cache.set(digest, claims, ttl=ttl)
+    return claims
 
 
 def validate_token(event):
     """Validate token and return user_id."""
+    return validate_token_claims(event)["user_id"]
+
+
+def validate_token_claims(event):
+    """Validate token and return its claims."""
     token = event.get("headers", {}).get("Authorization")
     if not token:
         raise CustomException("Authorization token is required.", 401)
 
     try:
         token = token.split(" ")[1]
-        decoded_token = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
-        return decoded_token["user_id"]
+        return decode_token(token)
     except IndexError:
         raise CustomException("Invalid Authorization header format.", 401)
     except jwt.ExpiredSignatureError:
@@ -27,6 +62,12 @@ def validate_token(event):
         raise CustomException("Authorization token is invalid.", 401)
 
 
+def check_query_budget(conn):
+    """Fail the request if it exceeded QUERY_BUDGET (QUERY_BUDGET_STRICT)."""
+    if QUERY_BUDGET_STRICT:
+        conn.stats.check_budget()
+
+
 def handle_response(event, context, data):
     """Format and return response."""
     r = Response(event, data, context)
@@ -39,29 +80,41 @@ def authorized(func):
     """
 
     def verify_authorization(event, context):
+        trace = start_trace(func.__name__, event)
+        profiler = start_profiler(event)
+        try:
+            return _verify_authorization(event, context)
+        finally:
+            stop_profiler(profiler, func.__name__)
+            end_trace(trace)
+
+    def _verify_authorization(event, context):
         conn = None
         try:
             conn = DataBase()
+            conn.stats.handler = func.__name__
 
             # Set temporary permissions
-            if func.__name__ in (
-                "auth",
-                "user",
-                "gender",
-                "document_type",
-                "country",
-                "state",
-                "city",
-                "address",
-            ):
-                data = func(event, context, conn)
+            if func.__name__ in PUBLIC_HANDLERS:
+                with span("handler"):
+                    data = func(event, context, conn)
                 data["auth"] = True
+                check_query_budget(conn)
                 return handle_response(event, context, data)
 
-            event["user_id"] = validate_token(event)
+            with span("validate_token"):
+                claims = validate_token_claims(event)
+                event["user_id"] = claims["user_id"]
+
+            with span("check_permission"):
+                permission_engine.check(
+                    conn, func.__name__, event.get("httpMethod", ""), claims
+                )
 
-            data = func(event, context, conn)
+            with span("handler"):
+                data = func(event, context, conn)
             data["auth"] = True
+            check_query_budget(conn)
 
         except CustomException as err:
             data = get_and_print_error(err, err.status_code, err.message)
@@ -75,6 +128,9 @@ def authorized(func):
             data = get_and_print_error(err, 500, str(err))
         except (SQLAlchemyError, Exception) as err:
             data = get_and_print_error(err, 500, str(err))
+        finally:
+            if conn:
+                conn.stats.emit()
 
         return handle_response(event, context, data)
 
@@ -1,9 +1,14 @@
 from xlsxwriter import Workbook
-from typing import Any, Union, List, Dict, Optional
+from typing import Any, Union, List, Dict, Iterable, Optional
 from typing_extensions import TypedDict
 from io import BytesIO
-from Utils.Functions import valBucketRoute, generate_hash_from_date
-from boto3 import client as boto3_client
+from itertools import chain, islice
+from datetime import date, datetime, time
+from decimal import Decimal
+from Utils.GeneralTools import valBucketRoute, generate_hash_from_date
+from Utils.S3Manager import get_s3_client
+
+DATETIME_FORMAT = "yyyy-mm-dd hh:mm:ss"
 
 # Typing customs definitions
 ExcelManagerFile = Union[str, bytes, None]
@@ -13,7 +18,9 @@ ExcelManagerColumn = Union[str, Any]
 
 class ExcelManagerSheetData(TypedDict):
     column_names: Optional[List[ExcelManagerColumn]]
-    data: Union[Dict[str, Any], List[ExcelManagerRow]]
+    data: Union[
+        Dict[str, Any], List[ExcelManagerRow], Iterable[ExcelManagerRow]
+    ]
 
 
 ExcelManagerData = Dict[str, ExcelManagerSheetData]
@@ -32,6 +39,8 @@ class ExcelManager:
 
     DEFAULT_FILE_EXT = ".xlsx"
     DEFAULT_S3_BUCKET = ""
+    # Rows used to estimate column widths when streaming
+    WIDTH_SAMPLE_ROWS = 1000
 
     def __init__(self, filename: str = "", **extra: Any):
         """
@@ -46,6 +55,11 @@ class ExcelManager:
                 - str: bucket_name: The s3 bucket name
                 - bool: same_data_length: If provided validates column_names
                 and rows have the same ammount of columns
+                - bool: streaming: Uses xlsxwriter constant_memory mode, rows
+                are flushed to disk as they are written (see
+                generate_streaming_file). Not compatible with in_memory
+                - str: tmpdir: Directory of the xlsxwriter temporary files
+                (streaming mode), defaults to the system temp directory
 
                 Note: s3 parameters are optional. If no s3 parameters are
                 provided, the file will be stored in file_route
@@ -54,15 +68,19 @@ class ExcelManager:
         self.__filename = f"{filename}_{generate_hash_from_date()}"
         file_route: str = extra.get("file_route", "/tmp/")
 
-        self.__in_memory_mode = extra.get("in_memory", False)
+        self.__streaming_mode = extra.get("streaming", False)
+        # xlsxwriter ignores constant_memory for in memory workbooks
+        self.__in_memory_mode = (
+            extra.get("in_memory", False) and not self.__streaming_mode
+        )
         self.__s3_route = extra.get("s3_route", None)
         self.__s3_client = None
 
         if self.__s3_route:  # Validating s3 route
             valBucketRoute(self.__s3_route)
             self.__bucket_name = extra.get("bucket_name", self.DEFAULT_S3_BUCKET)
-            # Initializing s3 client
-            self.__s3_client = boto3_client("s3")
+            # Shared s3 client
+            self.__s3_client = get_s3_client()
 
         self.__full_route = file_route + self.__filename + self.DEFAULT_FILE_EXT
 
@@ -71,12 +89,17 @@ class ExcelManager:
             self.__binaries = BytesIO()
             self.__workbook = Workbook(
                 self.__binaries,
-                {"in_memory": True, "default_date_format": "yyyy-mm-dd hh:mm:ss"},
+                {"in_memory": True, "default_date_format": DATETIME_FORMAT},
             )
 
         else:
             self.__workbook = Workbook(
-                self.__full_route, {"default_date_format": "yyyy-mm-dd hh:mm:ss"}
+                self.__full_route,
+                {
+                    "constant_memory": self.__streaming_mode,
+                    "default_date_format": DATETIME_FORMAT,
+                    "tmpdir": extra.get("tmpdir", None),
+                },
             )
 
         # Title format
@@ -100,6 +123,17 @@ class ExcelManager:
             }
         )
 
+        # Date cell format (cell format does not define a num_format)
+        self.date_cell_format = self.__workbook.add_format(
+            {
+                "size": extra.get("cell_size", 12),
+                "align": extra.get("cell_align", "center"),
+                "border": extra.get("cell_border", 1),
+                "text_wrap": True,
+                "num_format": extra.get("date_format", DATETIME_FORMAT),
+            }
+        )
+
         # Optional
         self.same_data_length = extra.get("same_data_length", True)
 
@@ -128,6 +162,23 @@ class ExcelManager:
             - NOTE: 'column_names' parameter is optional if data is sent as a
             list of dictionaries. In that case, column names will be set as the
             dictionary keys of the first data element
+            - NOTE: Column widths are estimated from the first
+            WIDTH_SAMPLE_ROWS rows, as in generate_streaming_file
+        Returns:
+            A dictionary with ExcelManagerResponse structure
+        """
+        return self.generate_streaming_file(file_data)
+
+    def generate_streaming_file(
+        self, file_data: ExcelManagerData
+    ) -> ExcelManagerResponse:
+        """Generates a file consuming each sheet data lazily, e.g. from a
+        generator or DataBase.stream, and returns the file route if success.
+        Combined with streaming=True memory use does not depend on the
+        amount of rows.
+        Args:
+            file_data: A dictionary with the ExcelManagerData structure, see
+            generate_regular_file. 'data' may be any iterable of rows
         Returns:
             A dictionary with ExcelManagerResponse structure
         """
@@ -137,68 +188,39 @@ class ExcelManager:
 
         try:
             with self.__workbook as workbook:
-                # Retrieving data
                 for sheet_name, content in file_data.items():
                     worksheet = workbook.add_worksheet(name=sheet_name)
 
-                    data = content["data"]
+                    rows = iter(content["data"])
+                    # Only the sample is buffered, to estimate widths
+                    sample = list(islice(rows, self.WIDTH_SAMPLE_ROWS))
                     column_names: list = content.get("column_names", None)
 
-                    if not column_names:
-                        column_names = list(data[0].keys())
+                    if not column_names and sample:
+                        column_names = list(sample[0].keys())
 
-                    self.validate_sheet_content(column_names, data)
+                    self.validate_sheet_content(column_names or [], sample)
 
-                    column_width = self.get_columns_width(column_names, data)
+                    column_width = self.get_columns_width(column_names, sample)
 
-                    title_column_number: int = 0
-                    # Adding title row
-                    for name in column_names:
-                        worksheet.write(0, title_column_number, name, self.title_format)
+                    for col, name in enumerate(column_names):
+                        worksheet.write(0, col, name, self.title_format)
+                        worksheet.set_column(col, col, column_width[col])
 
-                        worksheet.set_column(
-                            title_column_number,
-                            title_column_number,
-                            column_width[title_column_number],
-                        )
+                    data_row_number = self.write_rows(
+                        worksheet, column_names, chain(sample, rows), sample
+                    )
 
-                        title_column_number += 1
+                    worksheet.autofilter(
+                        0, 0, data_row_number, len(column_names) - 1
+                    )
 
-                    data_row_number: int = 0
-                    # Adding data rows
-                    for row in data:
-
-                        if type(row) is dict:
-                            row = list(row.values())
-
-                        data_row_number += 1
-                        data_column_number: int = 0
-
-                        for value in row:
-
-                            # Validating row content
-                            self.validate_sheet_row(column_names, row)
-
-                            # Writing in cell
-                            worksheet.write(
-                                data_row_number,
-                                data_column_number,
-                                value,
-                                self.cell_format,
-                            )
-
-                            data_column_number += 1
-
-                    # Adding auto-filter
-                    worksheet.autofilter(0, 0, len(data) - 1, len(column_names) - 1)
-
-            if self.__in_memory_mode:  # Only if file is not required in memory
-                file_route = self.__binaries.getvalue()  # Getting binaries
+            if self.__in_memory_mode:
+                file_route = self.__binaries.getvalue()
             else:
                 file_route = self.__full_route
 
             if self.__s3_route:
-                # Sending file to S3
                 file_route = self.__upload_file_to_s3(file_route)
 
         except (AssertionError, Exception) as e:
@@ -207,6 +229,86 @@ class ExcelManager:
 
         return {"success": success, "file_route": file_route, "message": message}
 
+    def write_rows(
+        self,
+        worksheet,
+        column_names: list,
+        rows: Iterable[ExcelManagerRow],
+        sample: List[ExcelManagerRow],
+    ) -> int:
+        """Writes data rows below the title row. Each row is validated once
+        and each column is written with the xlsxwriter method matching the
+        type found for it in sample, skipping the per cell type detection of
+        worksheet.write. Values of another type fall back to write_value
+        Args:
+            worksheet: The destination worksheet
+            column_names: The sheet column names
+            rows: The data rows, lists or dictionaries
+            sample: Rows used to detect each column type
+        Returns:
+            The number of written rows
+        """
+        writers = self.get_column_writers(worksheet, len(column_names), sample)
+
+        row_number: int = 0
+        for row in rows:
+            if type(row) is dict:
+                row = list(row.values())
+
+            self.validate_sheet_row(column_names, row)
+
+            row_number += 1
+            for col, value in enumerate(row):
+                # Rows longer than column_names (same_data_length=False)
+                # have no writer for the extra values
+                if col < len(writers) and type(value) is writers[col][0]:
+                    _, write, cell_format = writers[col]
+                    write(row_number, col, value, cell_format)
+                else:
+                    self.write_value(worksheet, row_number, col, value)
+
+        return row_number
+
+    def get_column_writers(
+        self, worksheet, columns: int, sample: List[ExcelManagerRow]
+    ) -> list:
+        """Gets (type, write method, format) per column from the first not
+        None value of each column in sample"""
+        dispatch = {
+            bool: (worksheet.write_boolean, self.cell_format),
+            int: (worksheet.write_number, self.cell_format),
+            float: (worksheet.write_number, self.cell_format),
+            Decimal: (worksheet.write_number, self.cell_format),
+            # write keeps its detection of formulas ("=...") and urls
+            str: (worksheet.write, self.cell_format),
+            datetime: (worksheet.write_datetime, self.date_cell_format),
+            date: (worksheet.write_datetime, self.date_cell_format),
+        }
+        # Columns without a known type always use write_value
+        writers = [(None, None, None)] * columns
+
+        for row in sample:
+            if type(row) is dict:
+                row = list(row.values())
+
+            for col, value in enumerate(row[:columns]):
+                if writers[col][0] is None and type(value) in dispatch:
+                    writers[col] = (type(value), *dispatch[type(value)])
+
+            if all(writer[0] for writer in writers):
+                break
+
+        return writers
+
+    def write_value(self, worksheet, row: int, col: int, value: Any) -> None:
+        """Writes a value with the generic xlsxwriter type detection"""
+        cell_format = (
+            self.date_cell_format
+            if isinstance(value, (date, time))
+            else self.cell_format
+        )
+        worksheet.write(row, col, value, cell_format)
+
     def validate_sheet_content(self, column_names: list, data: list) -> None:
         """Validates sheet content is formatted and built correctly
         Args:
@@ -241,16 +343,17 @@ class ExcelManager:
         Returns:
             The s3 bucket url to download the file
         """
-        if not self.__in_memory_mode:
-            file = open(file, "rb")
-
         key_name = f"{self.__s3_route}{self.__filename}{self.DEFAULT_FILE_EXT}"
 
-        self.__s3_client.put_object(
-            Body=file,
-            Bucket=self.__bucket_name,
-            Key=key_name,
-        )
+        if self.__in_memory_mode:
+            self.__s3_client.put_object(
+                Body=file,
+                Bucket=self.__bucket_name,
+                Key=key_name,
+            )
+        else:
+            # Streams from disk, multipart for big files
+            self.__s3_client.upload_file(file, self.__bucket_name, key_name)
 
         # Generating download URL
         url = self.__s3_client.generate_presigned_url(
@@ -1,7 +1,46 @@
 from Utils.Http.StatusCode import StatusCode
-from traceback import TracebackException
+from traceback import StackSummary, walk_tb
+from os import environ
 from os.path import basename as path_basename
 from json import dumps as json_dumps
+from threading import Lock
+from time import monotonic
+
+# Full traces of 5xx errors rendered per window, past the limit they are
+# reported like 4xx errors
+ERROR_TRACE_LIMIT = int(environ.get("ERROR_TRACE_LIMIT", 20))
+ERROR_TRACE_WINDOW = float(environ.get("ERROR_TRACE_WINDOW", 60))
+
+
+class TraceRateLimiter:
+    """Allows up to limit full traces every window seconds."""
+
+    def __init__(
+        self,
+        limit: int = ERROR_TRACE_LIMIT,
+        window: float = ERROR_TRACE_WINDOW,
+    ):
+        self.limit = limit
+        self.window = window
+        self.suppressed = 0
+        self._count = 0
+        self._window_start = monotonic()
+        self._lock = Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            now = monotonic()
+            if now - self._window_start >= self.window:
+                self._window_start = now
+                self._count = 0
+            if self._count < self.limit:
+                self._count += 1
+                return True
+            self.suppressed += 1
+            return False
+
+
+trace_rate_limiter = TraceRateLimiter()
 
 
 def get_arrow_resume_stack(list_tracebacks: list) -> str:
@@ -36,35 +75,57 @@ def list_traceback(exc_value: BaseException) -> list:
         dict format except trace
     """
 
+    # get previous fails, so errors are appended by order of execution
+    chain = list()
+    while exc_value is not None and exc_value not in chain:
+        chain.append(exc_value)
+        exc_value = exc_value.__context__
+
     result = list()
+    for exc in reversed(chain):
+        # get stacktrace (cascade methods calls) without reading sources
+        stack = StackSummary.extract(
+            walk_tb(exc.__traceback__), lookup_lines=False
+        )
+        error_lines = [
+            {
+                "filename": frame_summary.filename,
+                "method": frame_summary.name,
+                "lineno": frame_summary.lineno,
+            }
+            for frame_summary in stack
+        ]
+        # only the raising line is read, it's the one shown in the resume
+        if error_lines:
+            error_lines[-1]["code"] = stack[-1].line
+
+        # append error, by order of execution
+        result.append(
+            {
+                "type": type(exc).__name__,
+                "message": str(exc),
+                "error_lines": error_lines
+            }
+        )
+    return result
 
-    # get previous fails, so errors are appended by order of execution
-    if exc_value.__context__:
-        result += list_traceback(exc_value.__context__)
-
-    # convert Exception into TracebackException
-    tbe = TracebackException.from_exception(exc_value)
-
-    # get stacktrace (cascade methods calls)
-    error_lines = list()
-    for frame_summary in tbe.stack:
-        summary_details = {
-            "filename": frame_summary.filename,
-            "method": frame_summary.name,
-            "lineno": frame_summary.lineno,
-            "code": frame_summary.line,
-        }
-        error_lines.append(summary_details)
-
-    # append error, by order of execution
-    result.append(
-        {
-            "type": tbe.exc_type.__name__,
-            "message": str(tbe),
-            "error_lines": error_lines
-        }
+
+def get_error_location(exc_value: BaseException) -> str:
+    """Where the exception was raised, without reading source lines.
+
+    Returns:
+        str: eg: 'User.py:120 in <register>'
+    """
+    tb = exc_value.__traceback__
+    if tb is None:
+        return "<unknown>"
+    while tb.tb_next:
+        tb = tb.tb_next
+    code = tb.tb_frame.f_code
+    return (
+        f"{path_basename(code.co_filename)}:{tb.tb_lineno} "
+        f"in <{code.co_name}>"
     )
-    return result
 
 
 def get_and_print_error(
@@ -76,6 +137,11 @@ def get_and_print_error(
 ):
     """
     Get response from error and status code and printing the traceback error
+
+    Expected errors (status code lower than 500) are reported with their
+    type, message and location only. The full trace of every chained
+    exception is rendered for 5xx errors, up to ERROR_TRACE_LIMIT every
+    ERROR_TRACE_WINDOW seconds.
     Args:
         exc_value (BaseException): Exception catched from try-except block.
         status_code (Union[int, StatusCode], optional): http status code.
@@ -86,14 +152,30 @@ def get_and_print_error(
     Returns:
         APIResponseType: dict format to response
     """
-    result = list_traceback(exc_value)
-    exception_trace = {
-        "exception": {
-            "trace": result,
-            "resume": get_arrow_resume_stack(result),
-            **kwargs,
+    status_code = StatusCode(status_code)
+
+    if status_code >= "5xx" and trace_rate_limiter.allow():
+        result = list_traceback(exc_value)
+        exception_trace = {
+            "exception": {
+                "trace": result,
+                "resume": get_arrow_resume_stack(result),
+                **kwargs,
+            }
+        }
+    else:
+        exception_trace = {
+            "exception": {
+                "type": type(exc_value).__name__,
+                "message": str(exc_value),
+                "resume": [get_error_location(exc_value)],
+                **(
+                    {"suppressed": trace_rate_limiter.suppressed}
+                    if status_code >= "5xx" else {}
+                ),
+                **kwargs,
+            }
         }
-    }
     # PRINT exception trace
     print(json_dumps(exception_trace))
 
@@ -101,7 +183,7 @@ def get_and_print_error(
         bypass
         if bypass
         else {
-            "statusCode": StatusCode(status_code),
+            "statusCode": status_code,
             "data": data,
             **(exception_trace),
         }
@@ -0,0 +1,260 @@
+import csv
+import gzip
+from decimal import Decimal
+from itertools import chain, islice
+from typing import Any, Dict, Iterable, Iterator, List, Union
+from typing_extensions import TypedDict
+from Utils.ExcelManager import ExcelManagerData, ExcelManagerRow
+from Utils.GeneralTools import valBucketRoute, generate_hash_from_date
+from Utils.S3Manager import S3Manager, transfer_config
+
+CSV_FORMAT = "csv"
+PARQUET_FORMAT = "parquet"
+
+
+class ExportManagerResponse(TypedDict):
+    success: bool
+    # One route (or presigned url) per sheet
+    file_route: Dict[str, str]
+    message: str
+
+
+class ExportManager:
+    """
+    Class to ease gzip CSV and Parquet generation. Accepts the same
+    ExcelManagerData input as ExcelManager, writing one file per sheet
+    """
+
+    FILE_EXT = {CSV_FORMAT: ".csv.gz", PARQUET_FORMAT: ".parquet"}
+    CONTENT_TYPE = {
+        CSV_FORMAT: "application/gzip",
+        PARQUET_FORMAT: "application/vnd.apache.parquet",
+    }
+    DEFAULT_S3_BUCKET = ""
+    # Rows written per chunk (and parquet row group)
+    CHUNK_SIZE = 10000
+    # Parquet chunks held in memory waiting for a column's first value
+    SCHEMA_MAX_BUFFERED_CHUNKS = 10
+
+    def __init__(
+        self, filename: str = "", file_format: str = CSV_FORMAT, **extra: Any
+    ):
+        """
+        Args:
+            filename: The filename (excluding extension)
+            file_format: 'csv' (gzip compressed) or 'parquet'
+            extra: The possible args are:
+                - str: file_route: The specified route where the files will
+                be created (before uploaded in S3 if required)
+                - str: s3_route: The bucket route where the files will be
+                stored
+                - str: bucket_name: The s3 bucket name
+                - int: chunk_size: Rows written per chunk
+                - bool: same_data_length: If provided validates column_names
+                and rows have the same ammount of columns
+
+                Note: s3 parameters are optional. If no s3 parameters are
+                provided, the files will be stored in file_route
+        """
+        assert file_format in self.FILE_EXT, (
+            f"Format '{file_format}' not supported, "
+            f"use one of {', '.join(self.FILE_EXT)}"
+        )
+
+        self.__filename = f"{filename}_{generate_hash_from_date()}"
+        self.__file_route: str = extra.get("file_route", "/tmp/")
+        self.file_format = file_format
+        self.chunk_size = extra.get("chunk_size", self.CHUNK_SIZE)
+        self.same_data_length = extra.get("same_data_length", True)
+
+        self.__s3_route = extra.get("s3_route", None)
+        if self.__s3_route:  # Validating s3 route
+            valBucketRoute(self.__s3_route)
+            self.__bucket_name = extra.get(
+                "bucket_name", self.DEFAULT_S3_BUCKET
+            )
+
+    def generate_file(
+        self, file_data: ExcelManagerData
+    ) -> ExportManagerResponse:
+        """Generates one file per sheet consuming data in chunks and returns
+        the file routes (or presigned urls when s3_route is set) if success
+        Args:
+            file_data: A dictionary with the ExcelManagerData structure, see
+            ExcelManager.generate_regular_file. 'data' may be any iterable
+        Returns:
+            A dictionary with ExportManagerResponse structure
+        """
+        success: bool = True
+        message: str = "Ok"
+        file_route: Dict[str, str] = {}
+
+        writers = {
+            CSV_FORMAT: self.write_csv,
+            PARQUET_FORMAT: self.write_parquet,
+        }
+
+        try:
+            for sheet_name, content in file_data.items():
+                rows = iter(content["data"])
+                first_rows = list(islice(rows, 1))
+                column_names: list = content.get("column_names", None)
+
+                if not column_names and first_rows:
+                    column_names = list(first_rows[0].keys())
+
+                if not column_names:
+                    raise AssertionError("'column_names' cannot be empty")
+
+                if not first_rows:
+                    raise AssertionError("'data' cannot be empty")
+
+                route = (
+                    f"{self.__file_route}{self.__filename}_"
+                    f"{S3Manager.slugify(sheet_name)}"
+                    f"{self.FILE_EXT[self.file_format]}"
+                )
+                writers[self.file_format](
+                    route,
+                    column_names,
+                    self.chunks(column_names, chain(first_rows, rows)),
+                )
+
+                file_route[sheet_name] = (
+                    self.__upload_file_to_s3(route)
+                    if self.__s3_route else route
+                )
+
+        except (AssertionError, Exception) as e:
+            success = False
+            message = str(e)
+
+        return {
+            "success": success, "file_route": file_route, "message": message
+        }
+
+    def chunks(
+        self, column_names: list, rows: Iterable[ExcelManagerRow]
+    ) -> Iterator[List[list]]:
+        """Groups rows as lists in chunks of chunk_size rows, validating
+        each row once"""
+        rows = iter(rows)
+        while True:
+            chunk = []
+            for row in islice(rows, self.chunk_size):
+                if type(row) is dict:
+                    row = list(row.values())
+
+                if self.same_data_length and len(row) != len(column_names):
+                    raise Exception(
+                        "Column names and data length must be the same"
+                    )
+                chunk.append(row)
+
+            if not chunk:
+                return
+            yield chunk
+
+    @staticmethod
+    def write_csv(
+        route: str, column_names: list, chunks: Iterable[List[list]]
+    ) -> None:
+        """Writes a gzip compressed CSV file chunk by chunk"""
+        with gzip.open(route, "wt", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file)
+            writer.writerow(column_names)
+            for chunk in chunks:
+                writer.writerows(chunk)
+
+    @staticmethod
+    def write_parquet(
+        route: str, column_names: list, chunks: Iterable[List[list]]
+    ) -> None:
+        """Writes a Parquet file, one row group per chunk. The type of each
+        column is taken from its first non null value, chunks are buffered
+        (up to SCHEMA_MAX_BUFFERED_CHUNKS) while a column has only nulls.
+        Columns still without values are stored as strings"""
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise AssertionError("Parquet export requires pyarrow")
+
+        writer = None
+        schema = None
+        pending = []
+
+        def open_writer():
+            nonlocal writer, schema
+            schema = pyarrow.schema([
+                field.with_type(pyarrow.string())
+                if pyarrow.types.is_null(field.type) else field
+                for field in schema
+            ])
+            writer = pyarrow.parquet.ParquetWriter(
+                route, schema, compression="snappy"
+            )
+            for table in pending:
+                writer.write_table(table.cast(schema))
+            pending.clear()
+
+        try:
+            for chunk in chunks:
+                columns = [
+                    [ExportManager.parquet_value(value) for value in column]
+                    for column in zip(*chunk)
+                ]
+                table = pyarrow.table(dict(zip(column_names, columns)))
+
+                if writer is not None:
+                    writer.write_table(table.cast(schema))
+                    continue
+
+                schema = pyarrow.schema([
+                    new if pyarrow.types.is_null(old.type) else old
+                    for old, new in zip(schema or table.schema, table.schema)
+                ])
+                pending.append(table)
+                if (
+                    not any(pyarrow.types.is_null(t) for t in schema.types)
+                    or len(pending) >= ExportManager.SCHEMA_MAX_BUFFERED_CHUNKS
+                ):
+                    open_writer()
+
+            if writer is None and pending:
+                open_writer()
+        finally:
+            if writer is not None:
+                writer.close()
+
+    @staticmethod
+    def parquet_value(value: Any) -> Union[Any, float]:
+        """Decimal is stored as float, as LayerRow does for responses"""
+        return float(value) if isinstance(value, Decimal) else value
+
+    def __upload_file_to_s3(self, route: str) -> str:
+        """Uploads the provided file into pre-defined s3
+        Args:
+            route: The local file route
+        Returns:
+            The s3 bucket url to download the file
+        """
+        key_name = f"{self.__s3_route}{route.rsplit('/', 1)[-1]}"
+
+        s3_manager = S3Manager()
+        s3_manager.client.upload_file(
+            route,
+            self.__bucket_name,
+            key_name,
+            ExtraArgs={"ContentType": self.CONTENT_TYPE[self.file_format]},
+            Config=transfer_config,
+        )
+
+        presigned = s3_manager.presigned_download_file(
+            self.__bucket_name, key_name
+        )
+        if not presigned["statusCode"]:
+            raise Exception(presigned["data"]["error"])
+
+        return presigned["data"]["url"]
+
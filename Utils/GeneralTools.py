@@ -1,11 +1,11 @@
 import os
 import resend
-import bcrypt
 from datetime import datetime
 from hashlib import sha256
 from json import loads as json_loads
 from copy import copy
 from typing import Union, Tuple
+from Utils.Auth.Passwords import password_hasher
 
 
 COLLECTION_LIST = [list, tuple, set]
@@ -39,6 +39,18 @@ def generate_hash_from_text(text: str) -> str:
     return sha256(bytes(text, "utf-8")).hexdigest()
 
 
+def valBucketRoute(route: str) -> None:
+    """Validates a s3 bucket route (key prefix) e.g. 'reports/equipments/'."""
+    assert (
+        type(route) is str
+        and route.endswith("/")
+        and not route.startswith("/")
+    ), (
+        f"Invalid s3 route '{route}', it must end with '/' and not start "
+        "with it"
+    )
+
+
 def get_http_path_method(event: dict) -> Tuple[str, str]:
     """Get HTTP method from event."""
     if type(event) is dict:
@@ -113,14 +125,14 @@ def get_input_data(
     return input_type[method.upper()](event)
 
 
-def encrypt_field(password: str) -> str:
-    """ Encrypt received password with bcrypt."""
-    return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+def encrypt_field(password: str, hasher=password_hasher) -> str:
+    """ Encrypt received password with bcrypt (BCRYPT_ROUNDS)."""
+    return hasher.hash(password)
 
 
-def decrypt_password(password: str, encrypted_password: str) -> str:
+def decrypt_password(password: str, encrypted_password: str) -> bool:
     """ Decrypt encrypted password and compare with received."""
-    return bcrypt.checkpw(password.encode(), encrypted_password.encode())
+    return password_hasher.verify(password, encrypted_password)
 
 
 def send_mail(mail_data) -> dict:
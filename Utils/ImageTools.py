@@ -0,0 +1,75 @@
+from io import BytesIO
+from typing import Dict
+from PIL import Image, ImageOps
+from Utils.S3Manager import S3Manager
+
+# Longest side in pixels of each resized variant. Thumbnails are rendered
+# at 2x the 48px avatar so they stay sharp on high density screens.
+IMAGE_VARIANT_SIZES = {"thumbnail": 96, "medium": 480}
+IMAGE_VARIANT_QUALITY = 80
+
+# Routes whose uploads get resized variants
+IMAGE_ROUTES = ("profile_imgs/", "equipment_imgs/")
+
+
+def resize_image(data: bytes, size: int) -> bytes:
+    """
+    Resize an image so its longest side is at most size pixels.
+
+    Args:
+        data (bytes): The original image.
+        size (int): Maximum width/height of the result.
+
+    Returns:
+        bytes: The resized image encoded as WebP.
+    """
+    with Image.open(BytesIO(data)) as image:
+        # Apply EXIF rotation before dropping the metadata
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((size, size))
+
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "A" in image.mode else "RGB")
+
+        output = BytesIO()
+        image.save(output, "WEBP", quality=IMAGE_VARIANT_QUALITY)
+        return output.getvalue()
+
+
+def create_image_variants(
+    bucket: str, key_name: str, s3_manager: S3Manager = None
+) -> Dict[str, str]:
+    """
+    Download an uploaded image and store its resized variants beside it.
+
+    Args:
+        bucket (str): The bucket holding the image.
+        key_name (str): The key of the original image.
+        s3_manager (S3Manager, optional): S3 manager to reuse.
+
+    Returns:
+        Dict[str, str]: The key of every variant, including the original.
+
+    Raises:
+        ValueError: If the image could not be downloaded or stored.
+    """
+    s3_manager = s3_manager or S3Manager()
+
+    original = s3_manager.download_file(bucket, key_name)
+    if not original["statusCode"]:
+        raise ValueError(original["data"]["error"])
+
+    keys = {"original": key_name}
+    for variant, size in IMAGE_VARIANT_SIZES.items():
+        variant_key = S3Manager.variant_key(key_name, variant)
+        uploaded = s3_manager.upload_bytes(
+            bucket,
+            variant_key,
+            resize_image(original["data"], size),
+            "image/webp",
+        )
+        if not uploaded["statusCode"]:
+            raise ValueError(uploaded["data"]["error"])
+        keys[variant] = variant_key
+
+    return keys
@@ -0,0 +1,67 @@
+import os
+import boto3
+from collections import deque
+from json import dumps as json_dumps
+from typing import Any, Callable, Dict
+from Utils.Tracing import instrument_client
+
+# "lambda" in AWS, "memory" for local runs (serverless-offline, tests)
+JOB_QUEUE_BACKEND = os.getenv("JOB_QUEUE_BACKEND", "lambda")
+EXPORT_WORKER_FUNCTION = os.getenv("EXPORT_WORKER_FUNCTION")
+
+
+class LambdaJobQueue:
+    """Queues jobs as asynchronous invocations of a worker Lambda. AWS
+    keeps the invocation queue and retries failed invocations."""
+
+    def __init__(self, function_name: str = EXPORT_WORKER_FUNCTION):
+        self.function_name = function_name
+        self.client = instrument_client(boto3.client("lambda"))
+
+    def enqueue(self, payload: Dict[str, Any]) -> None:
+        self.client.invoke(
+            FunctionName=self.function_name,
+            InvocationType="Event",
+            Payload=json_dumps(payload).encode("utf-8"),
+        )
+
+
+class MemoryJobQueue:
+    """In-process stand-in for LambdaJobQueue. Jobs are kept until drain is
+    called, or run as soon as they are queued when eager is True."""
+
+    def __init__(self, eager: bool = True):
+        self.eager = eager
+        self.jobs = deque()
+        self.worker: Callable[[Dict[str, Any]], Any] = None
+
+    def enqueue(self, payload: Dict[str, Any]) -> None:
+        self.jobs.append(payload)
+        if self.eager and self.worker:
+            self.drain()
+
+    def drain(self) -> int:
+        """Runs every queued job with the worker, returns the amount run."""
+        processed = 0
+        while self.jobs:
+            self.worker(self.jobs.popleft())
+            processed += 1
+        return processed
+
+
+_memory_queue = MemoryJobQueue()
+
+
+def get_job_queue(worker: Callable[[Dict[str, Any]], Any] = None):
+    """
+    Returns the job queue configured by JOB_QUEUE_BACKEND.
+
+    Args:
+        worker: Function processing a job payload. Only used by the memory
+            backend, in AWS the payload is delivered to the worker Lambda.
+    """
+    if JOB_QUEUE_BACKEND == "memory":
+        if worker:
+            _memory_queue.worker = worker
+        return _memory_queue
+    return LambdaJobQueue()
@@ -1,21 +1,89 @@
 import os
 import pdfkit
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from hashlib import sha256
+from typing import Callable, List, Union
 
 LIBRARY_PATH = os.getenv("LIBRARY_PATH")
+# "wkhtmltopdf" or "fake" (tests and environments without the binary)
+PDF_BACKEND = os.getenv("PDF_BACKEND", "wkhtmltopdf")
+
+FORMAT_ENGINE = "format"
+JINJA2_ENGINE = "jinja2"
+
+# Concurrent wkhtmltopdf processes used by render_pdf_batch
+PDF_MAX_WORKERS = int(os.getenv("PDF_MAX_WORKERS", 4))
+# Separates documents merged in a single wkhtmltopdf invocation
+PAGE_BREAK = '<div style="page-break-after: always;"></div>'
+
+
+@lru_cache(maxsize=None)
+def get_configuration(wkhtmltopdf_path: str) -> pdfkit.configuration:
+    """Return the pdfkit configuration, built once per binary path."""
+    return pdfkit.configuration(wkhtmltopdf=wkhtmltopdf_path)
+
+
+@lru_cache(maxsize=64)
+def compile_template(template: str, engine: str) -> Callable[[dict], str]:
+    """Return a render function for the template, compiled once."""
+    if engine == JINJA2_ENGINE:
+        from jinja2 import Environment, select_autoescape
+
+        compiled = Environment(
+            autoescape=select_autoescape(default_for_string=True)
+        ).from_string(template)
+        return lambda content: compiled.render(**content)
+
+    return template.format_map
+
+
+class WkhtmltopdfBackend:
+    """Converts HTML to PDF bytes with a wkhtmltopdf process."""
+
+    def __init__(self, wkhtmltopdf_path: str = LIBRARY_PATH):
+        self.config = get_configuration(wkhtmltopdf_path)
+
+    def __call__(self, html: str) -> bytes:
+        return pdfkit.from_string(html, False, configuration=self.config)
+
+
+class FakePDFBackend:
+    """Returns a tiny deterministic document instead of a real PDF."""
+
+    def __call__(self, html: str) -> bytes:
+        digest = sha256(html.encode("utf-8")).hexdigest()
+        return f"%PDF-1.4\n% fake {digest}\n%%EOF\n".encode("ascii")
+
+
+PDF_BACKENDS = {"wkhtmltopdf": WkhtmltopdfBackend, "fake": FakePDFBackend}
 
 
 class PDFGenerator:
     """Class to generate PDF documents from HTML templates."""
 
-    def __init__(self):
-        """Initialize PDFGenerator with the path to wkhtmltopdf."""
+    def __init__(
+        self,
+        engine: str = FORMAT_ENGINE,
+        backend: Callable[[str], bytes] = None,
+    ):
+        """
+        Initialize PDFGenerator with the path to wkhtmltopdf.
+
+        Args:
+            engine (str): Template syntax, 'format' (str.format, default)
+                or 'jinja2'.
+            backend (Callable[[str], bytes], optional): HTML to PDF
+                converter. Defaults to the one selected by PDF_BACKEND.
+        """
         self.wkhtmltopdf_path = LIBRARY_PATH
         self.output_directory = "/temp"
-        self.config = pdfkit.configuration(wkhtmltopdf=self.wkhtmltopdf_path)
+        self.engine = engine
+        self.backend = backend or PDF_BACKENDS[PDF_BACKEND]()
 
-        # Ensure output directory exists
-        if not os.path.exists(self.output_directory):
-            os.makedirs(self.output_directory)
+    def render_html(self, template: str, content: dict) -> str:
+        """Render the HTML template with the content."""
+        return compile_template(template, self.engine)(content)
 
     def generate_pdf(
         self, template: str, output_pdf_name: str, content: dict
@@ -32,17 +100,72 @@ class PDFGenerator:
             str: The path to the generated PDF file.
         """
         try:
-            # Render the HTML template with the content
-            rendered_template = template.format(**content)
+            # Ensure output directory exists
+            os.makedirs(self.output_directory, exist_ok=True)
 
             # Ensure output path is correctly set
             pdf_path = os.path.join(self.output_directory, output_pdf_name)
 
             # Generate PDF from the rendered HTML string
-            pdfkit.from_string(
-                rendered_template, pdf_path, configuration=self.config
-            )
+            with open(pdf_path, "wb") as pdf_file:
+                pdf_file.write(
+                    self.backend(self.render_html(template, content))
+                )
 
             return pdf_path
         except Exception as e:
             raise Exception(f"Error generating PDF: {str(e)}")
+
+    def render_pdf(self, template: str, content: dict) -> bytes:
+        """
+        Generate a PDF in memory from the rendered HTML template.
+
+        Args:
+            template (str): The HTML template to render.
+            content (dict): The data to render in the HTML template.
+
+        Returns:
+            bytes: The PDF document.
+        """
+        try:
+            return self.backend(self.render_html(template, content))
+        except Exception as e:
+            raise Exception(f"Error generating PDF: {str(e)}")
+
+    def render_pdf_batch(
+        self,
+        template: str,
+        contents: List[dict],
+        merge: bool = False,
+        max_workers: int = PDF_MAX_WORKERS,
+    ) -> Union[List[bytes], bytes]:
+        """
+        Generate many PDFs in memory from the same template.
+
+        Args:
+            template (str): The HTML template to render.
+            contents (List[dict]): The data of each document.
+            merge (bool): If True all documents are rendered as pages of a
+                single PDF with one wkhtmltopdf process. Otherwise each
+                document is a separate PDF, rendered by up to max_workers
+                concurrent wkhtmltopdf processes.
+            max_workers (int): Concurrent processes when merge is False.
+
+        Returns:
+            Union[List[bytes], bytes]:
+                The PDFs in the contents order, or the merged PDF.
+        """
+        if merge:
+            html = PAGE_BREAK.join(
+                self.render_html(template, content) for content in contents
+            )
+            try:
+                return self.backend(html)
+            except Exception as e:
+                raise Exception(f"Error generating PDF: {str(e)}")
+
+        # wkhtmltopdf runs in a subprocess, threads only wait for it
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(
+                lambda content: self.render_pdf(template, content), contents
+            ))
@@ -0,0 +1,144 @@
+import os
+import sys
+from collections import Counter
+from random import random
+from threading import Event, Thread, get_ident
+from time import strftime
+from typing import Optional
+
+# Profile a PROFILE_SAMPLE_RATE share of the requests (0 disables)
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", 0))
+# Also profile requests sent with the X-Profile header. Off by default,
+# anyone able to call the API could otherwise slow it down
+PROFILE_ALLOW_HEADER = os.getenv("PROFILE_ALLOW_HEADER", "0") == "1"
+PROFILE_HEADER = "X-Profile"
+# Milliseconds between two stack samples of the handler thread
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", 5))
+# Profiles are uploaded to PROFILE_BUCKET when set, else kept in /tmp
+PROFILE_BUCKET = os.getenv("PROFILE_BUCKET")
+PROFILE_ROUTE = "profiles/"
+PROFILE_DIRECTORY = "/tmp/profiles"
+
+
+class SamplingProfiler:
+    """
+    Samples the stack of one thread from a background thread.
+
+    The result is written as collapsed stacks ("frame;frame;frame count"
+    per line), the input of flamegraph.pl, speedscope and Pyroscope.
+    """
+
+    def __init__(self, interval_ms: float = PROFILE_INTERVAL_MS):
+        self.interval = interval_ms / 1000
+        self.stacks = Counter()
+        self.samples = 0
+        self._thread_id = None
+        self._stop = Event()
+        self._sampler: Optional[Thread] = None
+
+    def start(self) -> "SamplingProfiler":
+        """Starts sampling the calling thread."""
+        self._thread_id = get_ident()
+        self._stop.clear()
+        self._sampler = Thread(
+            target=self._run, name="sampling-profiler", daemon=True
+        )
+        self._sampler.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+            self._sampler = None
+
+    def __enter__(self) -> "SamplingProfiler":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is not None:
+                self.stacks[self._collapse(frame)] += 1
+                self.samples += 1
+
+    @staticmethod
+    def _collapse(frame) -> str:
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(
+                f"{code.co_name} "
+                f"({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            )
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+    def collapsed(self) -> str:
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self.stacks.most_common()
+        )
+
+    def save(self, name: str) -> str:
+        """
+        Writes the collapsed stacks to S3 (PROFILE_BUCKET) or /tmp.
+
+        Args:
+            name (str): Prefix of the file, usually the handler.
+
+        Returns:
+            str: The S3 key or the local path of the profile.
+        """
+        filename = f"{name}_{strftime('%Y%m%d%H%M%S')}_{id(self):x}.folded"
+        data = self.collapsed()
+
+        if PROFILE_BUCKET:
+            from Utils.S3Manager import S3Manager
+
+            key_name = f"{PROFILE_ROUTE}{filename}"
+            response = S3Manager().upload_bytes(
+                PROFILE_BUCKET, key_name, data.encode("utf-8"), "text/plain"
+            )
+            if response["statusCode"]:
+                return key_name
+            print(f"Profile upload failed: {response['data']['error']}")
+
+        os.makedirs(PROFILE_DIRECTORY, exist_ok=True)
+        route = os.path.join(PROFILE_DIRECTORY, filename)
+        with open(route, "w") as file:
+            file.write(data)
+        return route
+
+
+def start_profiler(event: dict = None) -> Optional[SamplingProfiler]:
+    """
+    Starts profiling the request when it is sampled by PROFILE_SAMPLE_RATE
+    or asked for with the X-Profile header (PROFILE_ALLOW_HEADER).
+
+    Returns:
+        Optional[SamplingProfiler]: The running profiler or None.
+    """
+    headers = (event or {}).get("headers") or {}
+    requested = PROFILE_ALLOW_HEADER and (
+        headers.get(PROFILE_HEADER) or headers.get(PROFILE_HEADER.lower())
+    )
+    if not requested and not (
+        PROFILE_SAMPLE_RATE and random() < PROFILE_SAMPLE_RATE
+    ):
+        return None
+    return SamplingProfiler().start()
+
+
+def stop_profiler(profiler: Optional[SamplingProfiler], name: str) -> None:
+    """Stops the profiler and saves the profile, never failing the request."""
+    if profiler is None:
+        return
+    profiler.stop()
+    try:
+        route = profiler.save(name)
+        print(f"Profile of {name} ({profiler.samples} samples): {route}")
+    except Exception as e:
+        print(f"Profile of {name} could not be saved: {e}")
@@ -1,5 +1,9 @@
 from sqlalchemy.orm.decl_api import DeclarativeMeta
-from typing import Union
+from importlib import import_module
+from os.path import dirname, join as path_join
+from pkgutil import iter_modules
+from threading import Lock
+from typing import Dict, Tuple, Union
 
 MODEL_PYTHON_CAST = {
     "INTEGER": int,
@@ -13,13 +17,100 @@ MODEL_PYTHON_CAST = {
 
 MODEL_MYSQL_CAST = {"NUMERIC": "DECIMAL", "INTEGER": "INT"}
 
+# Columns left out by exclude_defaults
+DEFAULT_COLUMNS = ("active", "deleted", "created_at", "updated_at")
+MODELS_PACKAGE = "Models"
+MODELS_PATH = path_join(dirname(dirname(__file__)), MODELS_PACKAGE)
+
+
+class ModelMeta:
+    """Column metadata of a model, read once from its table."""
+
+    def __init__(self, model: DeclarativeMeta):
+        table = model.__table__
+        self.model = model
+        self.table_name: str = model.__tablename__
+        self.columns: Tuple = tuple(table.columns)
+        self.column_names: Tuple[str, ...] = tuple(
+            col.name for col in self.columns
+        )
+        self.pk_names: Tuple[str, ...] = tuple(
+            col.name for col in table.primary_key.columns
+        )
+        self.pk_name: str = self.pk_names[0] if self.pk_names else None
+        # {column: attributes} as returned by get_column_attributes
+        self.attributes: Dict[str, dict] = {
+            col.name: get_column_attributes(col) for col in self.columns
+        }
+        # {column: type} to use with Validations
+        self.cast_types: Dict[str, Union[type, str]] = {
+            name: attributes["type"]
+            for name, attributes in self.attributes.items()
+        }
+
+    def names(
+        self,
+        exclude_primary: bool = False,
+        exclude_defaults: bool = True,
+        excluded_columns=None,
+    ) -> list:
+        """Column names in table order, without the excluded ones."""
+        excluded = set(excluded_columns or ())
+        if exclude_defaults:
+            excluded.update(DEFAULT_COLUMNS)
+        if exclude_primary:
+            excluded.update(self.pk_names)
+        return [name for name in self.column_names if name not in excluded]
+
+
+_model_registry: Dict[DeclarativeMeta, ModelMeta] = {}
+_registry_lock = Lock()
+_registry_loaded = False
+
+
+def load_model_registry() -> Dict[DeclarativeMeta, ModelMeta]:
+    """
+    Builds the metadata of every model in Models/, once per process.
+
+    Returns:
+        Dict[DeclarativeMeta, ModelMeta]: The registry by model class.
+    """
+    global _registry_loaded
+    if _registry_loaded:
+        return _model_registry
+
+    with _registry_lock:
+        if not _registry_loaded:
+            for module_info in iter_modules([MODELS_PATH]):
+                module = import_module(f"{MODELS_PACKAGE}.{module_info.name}")
+                for value in vars(module).values():
+                    if (
+                        isinstance(value, DeclarativeMeta)
+                        and hasattr(value, "__table__")
+                        and value not in _model_registry
+                    ):
+                        _model_registry[value] = ModelMeta(value)
+            _registry_loaded = True
+
+    return _model_registry
+
+
+def get_model_meta(model: DeclarativeMeta) -> ModelMeta:
+    """Returns the registry metadata of model, adding models defined
+    outside Models/ on first use."""
+    meta = load_model_registry().get(model)
+    if meta is None:
+        with _registry_lock:
+            meta = _model_registry.setdefault(model, ModelMeta(model))
+    return meta
+
 
 def get_model_columns(
     model,
     exclude_primary: bool = False,
     exclude_defaults: bool = True,
     get_attributes: bool = False,
-    excluded_columns=[],
+    excluded_columns=None,
 ) -> Union[list, dict]:
     """
     Returns a list of column names as strings
@@ -32,31 +123,14 @@ def get_model_columns(
     :param excluded_columns: list of column names(string) to exclude
     :return: list of column names as strings
     """
-    model_columns = model.__table__.columns  # Get all model columns
-    table_name = model.__tablename__  # Get table name
-    column_names = {} if get_attributes else []
-
-    if exclude_defaults:
-        # Extending excluded columns
-        excluded_columns.extend(
-            ["active", "deleted", "created_at", "updated_at"]
-        )
-
-    for col in model_columns:
-        # Getting column name
-        column_name = str(col).replace(f"{table_name}.", "")
-
-        if column_name in excluded_columns:
-            continue
-
-        if exclude_primary and col.primary_key:  # Exclude primary key
-            continue
+    meta = get_model_meta(model)
+    column_names = meta.names(
+        exclude_primary, exclude_defaults, excluded_columns
+    )
 
-        if get_attributes:
-            # Getting each column attributes
-            column_names.update(**{column_name: get_column_attributes(col)})
-        else:
-            column_names.append(column_name)
+    if get_attributes:
+        # Copies, callers are free to modify them
+        return {name: dict(meta.attributes[name]) for name in column_names}
 
     return column_names
 
@@ -79,7 +153,7 @@ def all_columns_excluding(
     excluded_set = set(excluded or [])
 
     return [
-        col for col in model.__table__.columns
+        col for col in get_model_meta(model).columns
         if col.key not in excluded_set
         and (not primary_key or not col.primary_key)
     ]
@@ -89,7 +163,7 @@ def generate_cast_type_model(
     model,
     exclude_primary: bool = True,
     exclude_defaults: bool = True,
-    excluded_columns=[],
+    excluded_columns=None,
 ) -> dict:
     """Generates cast type model columns' dictionary with structure
     {model_column_name: type}
@@ -101,34 +175,14 @@ def generate_cast_type_model(
         excluded_columns: A list of column names(as string) to exclude
     Returns:
     """
-    # Getting table columns and name
-    model_columns = model.__table__.columns
-    table_name = model.__tablename__
-    column_names = {}
+    meta = get_model_meta(model)
 
-    if exclude_defaults:
-        # Extending excluded columns
-        excluded_columns.extend(
-            ["active", "deleted", "created_at", "updated_at"]
+    return {
+        name: meta.cast_types[name]
+        for name in meta.names(
+            exclude_primary, exclude_defaults, excluded_columns
         )
-
-    for col in model_columns:
-
-        # Getting column name
-        column_name = str(col).replace(f"{table_name}.", "")
-
-        if column_name in excluded_columns:
-            continue
-
-        if exclude_primary and col.primary_key:  # Excluding primary key
-            continue
-
-        # Extracting and casting column type
-        text_type = type_to_str(col.type)
-        type_ = cast_type(text_type)
-        column_names[column_name] = type_
-
-    return column_names
+    }
 
 
 def generate_json_model(model, cal_index=True):
@@ -183,7 +237,7 @@ def generate_json_model(model, cal_index=True):
 
 def get_pk_name(model: DeclarativeMeta) -> str:
     """Gets primary key model column name"""
-    return model.__table__.primary_key.columns.values()[0].name
+    return get_model_meta(model).pk_name
 
 
 def print_query(stmt):
@@ -1,6 +1,7 @@
 from json import dumps as json_dumps
 from Utils.Http.StatusCode import StatusCode
 from Utils.GeneralTools import get_input_data
+from Utils.Tracing import span
 
 
 class Response:
@@ -25,32 +26,33 @@ class Response:
         Returns:
             dict: The dictionary response.
         """
-        # get from Http.StatusCode constants module custom data
-        stcd = StatusCode(self.statusCode)
-
-        response = {
-            "headers": {
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Methods": "OPTIONS,POST,GET",
-                "Access-Control-Allow-Headers": (
-                    "Origin, X-Requested-With, Content-Type, Accept"
-                ),
-            },
-            "statusCode": str(self.statusCode),
-            "body": json_dumps(
-                {
-                    "responseCode": int(stcd),
-                    "responseReason": stcd.name,
-                    "description": stcd.description,
-                    "data": self.data,
-                    **(
-                        {"tracebackException": self.exception}
-                        if self.exception else {}
+        with span("response.serialize"):
+            # get from Http.StatusCode constants module custom data
+            stcd = StatusCode(self.statusCode)
+
+            response = {
+                "headers": {
+                    "Access-Control-Allow-Origin": "*",
+                    "Access-Control-Allow-Methods": "OPTIONS,POST,GET",
+                    "Access-Control-Allow-Headers": (
+                        "Origin, X-Requested-With, Content-Type, Accept"
                     ),
-                    **({"qope": self.qope} if self.qope else {}),
-                }
-            ),
-        }
+                },
+                "statusCode": str(self.statusCode),
+                "body": json_dumps(
+                    {
+                        "responseCode": int(stcd),
+                        "responseReason": stcd.name,
+                        "description": stcd.description,
+                        "data": self.data,
+                        **(
+                            {"tracebackException": self.exception}
+                            if self.exception else {}
+                        ),
+                        **({"qope": self.qope} if self.qope else {}),
+                    }
+                ),
+            }
 
         return response
 
@@ -1,45 +1,203 @@
 import os
 import boto3
+from binascii import a2b_base64, Error as BinasciiError
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from boto3.s3.transfer import TransferConfig
 from botocore.config import Config
 from botocore.exceptions import BotoCoreError, ClientError
-from base64 import decodebytes
-from re import sub
+from io import RawIOBase
+from re import compile as re_compile, sub
+from threading import Lock
+from time import sleep
 from unicodedata import normalize
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+from Utils.CacheTools import TTLCache
 from Utils.GeneralTools import generate_hash_from_date, as_list
 from Utils.Http.StatusCode import StatusCode
+from Utils.Tracing import instrument_client
 from Utils.TypingTools import APIResponseType, Union
+from Utils.Validations import FILE_MAX_SIZE, Validations
+
+PRESIGNED_URL_EXPIRATION = 300
+# URLs are reused while they still have at least one minute of validity
+PRESIGNED_URL_CACHE_TTL = PRESIGNED_URL_EXPIRATION - 60
+
+S3_MAX_POOL_CONNECTIONS = int(os.getenv("S3_MAX_POOL_CONNECTIONS", 32))
+
+# Uploads above the threshold are sent as multipart uploads
+MULTIPART_THRESHOLD = 8 * 1024 * 1024
+MULTIPART_CHUNKSIZE = 8 * 1024 * 1024
+transfer_config = TransferConfig(
+    multipart_threshold=MULTIPART_THRESHOLD,
+    multipart_chunksize=MULTIPART_CHUNKSIZE,
+)
+
+# Size of the chunks yielded by stream_download_file
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Bulk copies: objects copied at once and attempts per object
+COPY_MAX_WORKERS = 8
+COPY_MAX_ATTEMPTS = 3
+COPY_RETRY_DELAY = 0.2
+
+# Resized copies stored next to each uploaded image, see variant_key
+IMAGE_VARIANTS = ("thumbnail", "medium", "original")
+IMAGE_VARIANT_EXTENSION = "webp"
+# Variants are never rewritten once created, so found ones are remembered
+# for long. Missing ones are checked again soon, the resize may be running
+VARIANT_EXISTS_TTL = 3600
+VARIANT_MISSING_TTL = 60
+VARIANT_CHECK_MAX_WORKERS = 8
+# HEAD error codes meaning the object doesn't exist
+MISSING_OBJECT_CODES = ("404", "NoSuchKey", "NotFound", "403")
+
+# Characters ignored by the base64 decoder (whitespace, line breaks...)
+BASE64_NOISE = re_compile(r"[^A-Za-z0-9+/=]")
+# Amount of base64 characters decoded per read (multiple of 4)
+BASE64_READ_CHARS = 64 * 1024
+
+presigned_url_cache = TTLCache(maxsize=4096, ttl=PRESIGNED_URL_CACHE_TTL)
+variant_exists_cache = TTLCache(maxsize=4096, ttl=VARIANT_EXISTS_TTL)
+
+# Process-wide boto3 objects, created on first use and reused by every
+# S3Manager/ExcelManager instance of a warm Lambda container.
+_s3_session = None
+_s3_client = None
+_s3_resource = None
+_s3_lock = Lock()
+
+
+def _s3_config() -> Config:
+    return Config(
+        signature_version="s3v4",
+        region_name="us-east-2",
+        max_pool_connections=S3_MAX_POOL_CONNECTIONS,
+        tcp_keepalive=True,
+    )
+
+
+def _get_s3_session() -> boto3.session.Session:
+    global _s3_session
+    if _s3_session is None:
+        _s3_session = boto3.session.Session(
+            aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+            aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+        )
+    return _s3_session
+
+
+def get_s3_client():
+    """Return the shared S3 client, creating it on first call."""
+    global _s3_client
+    if _s3_client is None:
+        with _s3_lock:
+            if _s3_client is None:
+                _s3_client = instrument_client(_get_s3_session().client(
+                    "s3", config=_s3_config()
+                ))
+    return _s3_client
+
+
+def get_s3_resource():
+    """Return the shared S3 resource, creating it on first call."""
+    global _s3_resource
+    if _s3_resource is None:
+        with _s3_lock:
+            if _s3_resource is None:
+                _s3_resource = _get_s3_session().resource(
+                    "s3", config=_s3_config()
+                )
+                instrument_client(_s3_resource.meta.client)
+    return _s3_resource
+
+
+class Base64Stream(RawIOBase):
+    """Read-only file object decoding a base64 string chunk by chunk.
+
+    Only one decoded chunk is alive at a time, so the full binary payload is
+    never materialized. Raises ValueError as soon as more than max_size bytes
+    have been decoded or the payload is not valid base64.
+    """
+
+    def __init__(self, data: str, max_size: int = FILE_MAX_SIZE):
+        self._data = data
+        self._position = 0
+        self._carry = ""
+        self._buffer = b""
+        self.max_size = max_size
+        self.size = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._buffer and self._position < len(self._data):
+            self._buffer = self._decode_next()
+
+        length = min(len(buffer), len(self._buffer))
+        buffer[:length] = self._buffer[:length]
+        self._buffer = self._buffer[length:]
+        return length
+
+    def _decode_next(self) -> bytes:
+        end = self._position + BASE64_READ_CHARS
+        chunk = self._carry + BASE64_NOISE.sub(
+            "", self._data[self._position:end]
+        )
+        self._position = end
+
+        if self._position < len(self._data):
+            # Keep incomplete quantums for the next chunk
+            cut = len(chunk) - len(chunk) % 4
+            chunk, self._carry = chunk[:cut], chunk[cut:]
+        else:
+            self._carry = ""
+
+        try:
+            decoded = a2b_base64(chunk)
+        except BinasciiError:
+            raise ValueError("El archivo no está en formato Base64 válido.")
+
+        self.size += len(decoded)
+        if self.size > self.max_size:
+            raise ValueError("El archivo excede el tamaño máximo permitido.")
+
+        return decoded
 
 
 class S3Manager:
     def __init__(self):
         try:
-            config = Config(
-                signature_version="s3v4",
-                region_name="us-east-2",
-            )
-            self.s3 = boto3.resource(
-                service_name="s3",
-                aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-                aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
-                config=config,
-            )
-            self.client = self.s3.meta.client
+            self.client = get_s3_client()
         except (BotoCoreError, ClientError) as e:
             raise ConnectionError(f"Failed to connect to AWS S3: {str(e)}")
 
+    @property
+    def s3(self):
+        return get_s3_resource()
+
     def upload_base64_file(
-        self, bucket: str, key_name: str, file: str, bucket_route: str
+        self,
+        bucket: str,
+        key_name: str,
+        file: str,
+        bucket_route: str,
+        valid_extensions: list = None,
+        max_size: int = FILE_MAX_SIZE,
     ) -> APIResponseType:
         try:
             filename, extension = self.fix_name_file(key_name)
-            tmp_route = f"/tmp/{filename}.{extension}"
-
-            with open(tmp_route, "wb") as file_to_save:
-                decoded_data = decodebytes(file.encode("utf-8"))
-                file_to_save.write(decoded_data)
+            base64_data, _ = Validations.split_base64_file(
+                file, valid_extensions
+            )
 
             new_filename = f"{bucket_route}{filename}.{extension}"
-            self.client.upload_file(tmp_route, bucket, new_filename)
+            self.client.upload_fileobj(
+                Base64Stream(base64_data, max_size),
+                bucket,
+                new_filename,
+                Config=transfer_config,
+            )
 
             return {
                 "statusCode": StatusCode(200),
@@ -47,9 +205,13 @@ class S3Manager:
                     "hashed_filename": new_filename,
                     "s3_route": f"{new_filename}",
                     "file_name": filename,
-                    "tmp_route": tmp_route,
                 },
             }
+        except ValueError as e:
+            return {
+                "statusCode": StatusCode(400),
+                "data": {"error": str(e)},
+            }
         except (BotoCoreError, ClientError, IOError) as e:
             return {
                 "statusCode": StatusCode(500),
@@ -57,10 +219,17 @@ class S3Manager:
             }
 
     def download_file(
-        self, bucket: str, key_name: str, decode: str = None
+        self,
+        bucket: str,
+        key_name: str,
+        decode: str = None,
+        byte_range: Optional[Tuple[int, Optional[int]]] = None,
     ) -> APIResponseType:
         try:
-            response = self.client.get_object(Bucket=bucket, Key=key_name)
+            response = self.client.get_object(
+                Bucket=bucket, Key=key_name,
+                **self._range_param(byte_range),
+            )
             payload = response["Body"].read()
             if decode:
                 payload = payload.decode(decode)
@@ -71,6 +240,67 @@ class S3Manager:
                 "data": {"error": f"Download failed: {str(e)}"},
             }
 
+    def open_download_file(
+        self,
+        bucket: str,
+        key_name: str,
+        byte_range: Optional[Tuple[int, Optional[int]]] = None,
+    ) -> APIResponseType:
+        """Opens an object without reading it. data.body is a file-like
+        object (read(size), iter_chunks(size)) that can be handed to any
+        consumer expecting a file. byte_range=(start, end) fetches only
+        that inclusive range, end=None reads up to the end."""
+        try:
+            response = self.client.get_object(
+                Bucket=bucket, Key=key_name,
+                **self._range_param(byte_range),
+            )
+            return {
+                "statusCode": StatusCode(206 if byte_range else 200),
+                "data": {
+                    "body": response["Body"],
+                    "content_length": response.get("ContentLength"),
+                    "content_type": response.get("ContentType"),
+                    "content_range": response.get("ContentRange"),
+                },
+            }
+        except (BotoCoreError, ClientError) as e:
+            return {
+                "statusCode": StatusCode(500),
+                "data": {"error": f"Download failed: {str(e)}"},
+            }
+
+    def stream_download_file(
+        self,
+        bucket: str,
+        key_name: str,
+        chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+        byte_range: Optional[Tuple[int, Optional[int]]] = None,
+    ) -> Iterator[bytes]:
+        """Yields the object in chunks of chunk_size bytes, so memory use
+        does not depend on the object size. Raises IOError on failure."""
+        response = self.open_download_file(bucket, key_name, byte_range)
+        if not response["statusCode"]:
+            raise IOError(response["data"]["error"])
+
+        body = response["data"]["body"]
+        try:
+            for chunk in body.iter_chunks(chunk_size):
+                yield chunk
+        except (BotoCoreError, ClientError) as e:
+            raise IOError(f"Download failed: {str(e)}")
+        finally:
+            body.close()
+
+    @staticmethod
+    def _range_param(
+        byte_range: Optional[Tuple[int, Optional[int]]]
+    ) -> dict:
+        if not byte_range:
+            return {}
+        start, end = byte_range
+        return {"Range": f"bytes={start}-{'' if end is None else end}"}
+
     def download_file_to_tmp(
         self, bucket: str, key_name: str, tmp_route: str = None
     ) -> APIResponseType:
@@ -97,20 +327,112 @@ class S3Manager:
         self, bucket: str, key_name: str
     ) -> APIResponseType:
         try:
+            url = self._presigned_get_url(bucket, key_name)
+            return {"statusCode": StatusCode(200), "data": {"url": url}}
+        except (BotoCoreError, ClientError) as e:
+            return {
+                "statusCode": StatusCode(500),
+                "data": {
+                    "error": f"Presigned URL generation failed: {str(e)}"
+                },
+            }
+
+    def presigned_download_files(
+        self, bucket: str, key_names: Iterable[str]
+    ) -> Dict[str, Union[str, None]]:
+        """Presign many keys at once. Signing is local (no network call),
+        duplicated keys are signed only once and recently signed keys are
+        served from the url cache. Keys that fail to sign map to None."""
+        urls = {}
+        for key_name in key_names:
+            if not key_name or key_name in urls:
+                continue
+            try:
+                urls[key_name] = self._presigned_get_url(bucket, key_name)
+            except (BotoCoreError, ClientError):
+                urls[key_name] = None
+        return urls
+
+    def _presigned_get_url(self, bucket: str, key_name: str) -> str:
+        cache_key = (bucket, key_name)
+        url = presigned_url_cache.get(cache_key)
+        if url is None:
             url = self.client.generate_presigned_url(
                 "get_object",
                 Params={"Bucket": bucket, "Key": key_name},
-                ExpiresIn=300,
+                ExpiresIn=PRESIGNED_URL_EXPIRATION,
             )
-            return {"statusCode": StatusCode(200), "data": {"url": url}}
+            presigned_url_cache.set(cache_key, url)
+        return url
+
+    def presigned_upload_file(
+        self,
+        bucket: str,
+        key_name: str,
+        content_type: str,
+        max_size: int = FILE_MAX_SIZE,
+        expires_in: int = PRESIGNED_URL_EXPIRATION,
+    ) -> APIResponseType:
+        """Presigned POST policy letting a browser upload key_name directly
+        to S3. The policy pins the content type and bounds the size."""
+        try:
+            post = self.client.generate_presigned_post(
+                Bucket=bucket,
+                Key=key_name,
+                Fields={"Content-Type": content_type},
+                Conditions=[
+                    {"Content-Type": content_type},
+                    ["content-length-range", 1, max_size],
+                ],
+                ExpiresIn=expires_in,
+            )
+            return {
+                "statusCode": StatusCode(200),
+                "data": {
+                    "url": post["url"],
+                    "fields": post["fields"],
+                    "key": key_name,
+                },
+            }
         except (BotoCoreError, ClientError) as e:
             return {
                 "statusCode": StatusCode(500),
                 "data": {
-                    "error": f"Presigned URL generation failed: {str(e)}"
+                    "error": f"Presigned POST generation failed: {str(e)}"
                 },
             }
 
+    def upload_bytes(
+        self, bucket: str, key_name: str, data: bytes, content_type: str
+    ) -> APIResponseType:
+        try:
+            self.client.put_object(
+                Bucket=bucket, Key=key_name, Body=data,
+                ContentType=content_type,
+            )
+            return {"statusCode": StatusCode(200), "data": {"key": key_name}}
+        except (BotoCoreError, ClientError) as e:
+            return {
+                "statusCode": StatusCode(500),
+                "data": {"error": f"File upload failed: {str(e)}"},
+            }
+
+    def file_exists(self, bucket: str, key_name: str) -> bool:
+        return bool(self.object_status(bucket, key_name))
+
+    def object_status(self, bucket: str, key_name: str) -> Optional[bool]:
+        """HEAD key_name: True if it exists, False if S3 answered it doesn't
+        (404, or 403 without s3:ListBucket) and None if S3 could not be
+        asked (connection errors, timeouts, throttling...)."""
+        try:
+            self.client.head_object(Bucket=bucket, Key=key_name)
+            return True
+        except ClientError as e:
+            code = e.response.get("Error", {}).get("Code")
+            return False if code in MISSING_OBJECT_CODES else None
+        except BotoCoreError:
+            return None
+
     def copy_between_buckets(
         self,
         bucket_source: str,
@@ -118,32 +440,168 @@ class S3Manager:
         filename: Union[str, list],
         new_filename: Union[str, list, None] = None,
     ) -> APIResponseType:
-        try:
-            data = []
-            new_filename = as_list(new_filename or filename)
-            filename = as_list(filename)
-
-            assert len(filename) == len(
-                new_filename
-            ), "Source and target filenames must match in quantity."
-
-            for i in range(len(filename)):
-                copy_source = {"Bucket": bucket_source, "Key": filename[i]}
-                self.s3.Bucket(bucket_target).copy(
-                    copy_source, new_filename[i]
-                )
-                data.append(new_filename[i])
-
+        response = self.bulk_copy_between_buckets(
+            bucket_source, bucket_target, filename, new_filename
+        )
+        # All or nothing as before the bulk copy, a 207 is also a failure
+        errors = (
+            [item for item in response["data"] if "error" in item]
+            if isinstance(response["data"], list)
+            else [response["data"]]
+        )
+        if errors:
+            error = errors[0]
             return {
-                "statusCode": StatusCode(200),
-                "data": data if len(data) > 1 else data[0],
+                "statusCode": StatusCode(500),
+                "data": {"error": f"Copy failed: {error['error']}"},
             }
-        except (BotoCoreError, ClientError, AssertionError) as e:
+
+        data = [item["target"] for item in response["data"]]
+        return {
+            "statusCode": StatusCode(200),
+            "data": data if len(data) > 1 else data[0],
+        }
+
+    def bulk_copy_between_buckets(
+        self,
+        bucket_source: str,
+        bucket_target: str,
+        filename: Union[str, list],
+        new_filename: Union[str, list, None] = None,
+        max_workers: int = COPY_MAX_WORKERS,
+        max_attempts: int = COPY_MAX_ATTEMPTS,
+        progress: Optional[Callable[[int, int, dict], None]] = None,
+    ) -> APIResponseType:
+        """Copies many objects concurrently. Each object is retried up to
+        max_attempts times and large objects are copied server side with
+        multipart copies. progress(done, total, result) is called after
+        every object. Returns one result per key, in the input order, with
+        status 200 (all copied), 207 (some failed) or 500 (none copied)."""
+        new_filename = as_list(new_filename or filename)
+        filename = as_list(filename)
+
+        if len(filename) != len(new_filename) or not filename:
             return {
                 "statusCode": StatusCode(500),
-                "data": {"error": f"Copy failed: {str(e)}"},
+                "data": {
+                    "error": "Source and target filenames must match "
+                    "in quantity."
+                },
             }
 
+        results = [None] * len(filename)
+        with ThreadPoolExecutor(
+            max_workers=min(max_workers, len(filename))
+        ) as executor:
+            futures = {
+                executor.submit(
+                    self._copy_object, bucket_source, source,
+                    bucket_target, target, max_attempts,
+                ): i
+                for i, (source, target) in enumerate(
+                    zip(filename, new_filename)
+                )
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                results[futures[future]] = future.result()
+                if progress:
+                    progress(done, len(filename), future.result())
+
+        failed = sum(1 for result in results if "error" in result)
+        status = 200 if not failed else 207 if failed < len(results) else 500
+        return {"statusCode": StatusCode(status), "data": results}
+
+    def _copy_object(
+        self,
+        bucket_source: str,
+        source: str,
+        bucket_target: str,
+        target: str,
+        max_attempts: int,
+    ) -> dict:
+        result = {"source": source, "target": target, "attempts": 0}
+        for attempt in range(1, max_attempts + 1):
+            result["attempts"] = attempt
+            try:
+                self.client.copy(
+                    {"Bucket": bucket_source, "Key": source},
+                    bucket_target,
+                    target,
+                    Config=transfer_config,
+                )
+                result.pop("error", None)
+                return result
+            except (BotoCoreError, ClientError) as e:
+                result["error"] = str(e)
+                if attempt < max_attempts:
+                    sleep(COPY_RETRY_DELAY * 2 ** (attempt - 1))
+        return result
+
+    @staticmethod
+    def variant_key(key_name: str, variant: str = "original") -> str:
+        """Key of a resized variant of an image, e.g.
+        profile_imgs/a.jpg -> profile_imgs/a_thumbnail.webp"""
+        if not key_name or variant == "original":
+            return key_name
+        return (
+            f"{key_name.rsplit('.', 1)[0]}_{variant}.{IMAGE_VARIANT_EXTENSION}"
+        )
+
+    def resolve_variant_keys(
+        self, bucket: str, key_names: Iterable[str], variant: str = "original"
+    ) -> Dict[str, str]:
+        """Maps each image key to the key of its variant, or to itself while
+        the variant doesn't exist (upload not resized yet or image older
+        than the variants). Existence is checked with concurrent HEAD
+        requests and cached, see VARIANT_EXISTS_TTL."""
+        variant_keys = {
+            key_name: self.variant_key(key_name, variant)
+            for key_name in key_names
+            if key_name
+        }
+        if variant == "original" or not variant_keys:
+            return variant_keys
+
+        exists = {}
+        unknown = []
+        for key_name in set(variant_keys.values()):
+            cached = variant_exists_cache.get((bucket, key_name))
+            if cached is None:
+                unknown.append(key_name)
+            else:
+                exists[key_name] = cached
+
+        if unknown:
+            with ThreadPoolExecutor(
+                max_workers=min(VARIANT_CHECK_MAX_WORKERS, len(unknown))
+            ) as executor:
+                found = executor.map(
+                    lambda key_name: self.object_status(bucket, key_name),
+                    unknown,
+                )
+                for key_name, is_found in zip(unknown, found):
+                    exists[key_name] = bool(is_found)
+                    if is_found is None:
+                        # S3 failed, use the original without caching
+                        continue
+                    variant_exists_cache.set(
+                        (bucket, key_name),
+                        is_found,
+                        None if is_found else VARIANT_MISSING_TTL,
+                    )
+
+        return {
+            key_name: variant_key if exists[variant_key] else key_name
+            for key_name, variant_key in variant_keys.items()
+        }
+
+    @staticmethod
+    def is_variant_key(key_name: str) -> bool:
+        return any(
+            key_name.endswith(f"_{variant}.{IMAGE_VARIANT_EXTENSION}")
+            for variant in IMAGE_VARIANTS
+        )
+
     @classmethod
     def fix_name_file(cls, filename: str, maxlen: int = 40):
         extension = ""
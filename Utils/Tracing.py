@@ -0,0 +1,277 @@
+import os
+from contextvars import ContextVar
+from json import dumps as json_dumps
+from random import random
+from secrets import token_hex
+from time import time_ns
+from typing import Any, Dict, List, Optional
+
+# Tracing is off unless enabled, then a TRACE_SAMPLE_RATE share of the
+# requests (or the ones sent with the X-Trace header) is traced
+TRACE_ENABLED = os.getenv("TRACE_ENABLED", "0") == "1"
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", 1.0))
+# "json" (one line per trace) or "otel" (OTLP/JSON resourceSpans)
+TRACE_FORMAT = os.getenv("TRACE_FORMAT", "json")
+TRACE_HEADER = "X-Trace"
+SERVICE_NAME = os.getenv("AWS_LAMBDA_FUNCTION_NAME", "api")
+
+_current_trace: ContextVar[Optional["Trace"]] = ContextVar(
+    "current_trace", default=None
+)
+
+
+class Span:
+    """A timed operation of a trace."""
+
+    __slots__ = (
+        "trace", "name", "span_id", "parent_id", "start", "end",
+        "attributes", "error",
+    )
+
+    def __init__(
+        self,
+        trace: "Trace",
+        name: str,
+        parent_id: str = None,
+        attributes: Dict[str, Any] = None,
+    ):
+        self.trace = trace
+        self.name = name
+        self.span_id = token_hex(8)
+        self.parent_id = parent_id
+        self.start = time_ns()
+        self.end = None
+        self.attributes = attributes or {}
+        self.error = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def __enter__(self) -> "Span":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        self.trace.end_span(self)
+
+
+class _NoopSpan:
+    """Returned when the request is not traced, does nothing."""
+
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Trace:
+    """Spans recorded while handling one request."""
+
+    def __init__(self, name: str):
+        self.trace_id = token_hex(16)
+        self.spans: List[Span] = []
+        self._stack: List[Span] = []
+        self.root = self.start_span(name)
+
+    def start_span(self, name: str, attributes: dict = None) -> Span:
+        parent = self._stack[-1].span_id if self._stack else None
+        span = Span(self, name, parent, attributes)
+        self.spans.append(span)
+        self._stack.append(span)
+        return span
+
+    def end_span(self, span: Span) -> None:
+        span.end = time_ns()
+        if span in self._stack:
+            self._stack.remove(span)
+
+    def add_span(
+        self, name: str, seconds: float, attributes: dict = None
+    ) -> Span:
+        """Records an operation that already finished, taking seconds."""
+        span = Span(
+            self,
+            name,
+            self._stack[-1].span_id if self._stack else None,
+            attributes,
+        )
+        span.end = time_ns()
+        span.start = span.end - int(seconds * 1e9)
+        self.spans.append(span)
+        return span
+
+    def to_json(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "name": self.root.name,
+            "ms": _ms(self.root.end - self.root.start),
+            "spans": [
+                {
+                    "name": span.name,
+                    "span_id": span.span_id,
+                    "parent_id": span.parent_id,
+                    "offset_ms": _ms(span.start - self.root.start),
+                    "ms": _ms((span.end or span.start) - span.start),
+                    **({"attributes": span.attributes}
+                       if span.attributes else {}),
+                    **({"error": span.error} if span.error else {}),
+                }
+                for span in self.spans
+            ],
+        }
+
+    def to_otel(self) -> dict:
+        """The trace as an OTLP/JSON export request."""
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": _otel_attributes(
+                    {"service.name": SERVICE_NAME}
+                )},
+                "scopeSpans": [{
+                    "scope": {"name": __name__},
+                    "spans": [
+                        {
+                            "traceId": self.trace_id,
+                            "spanId": span.span_id,
+                            **({"parentSpanId": span.parent_id}
+                               if span.parent_id else {}),
+                            "name": span.name,
+                            # SPAN_KIND_SERVER for the request, else INTERNAL
+                            "kind": 2 if span is self.root else 1,
+                            "startTimeUnixNano": str(span.start),
+                            "endTimeUnixNano": str(span.end or span.start),
+                            "attributes": _otel_attributes(span.attributes),
+                            "status": (
+                                {"code": 2, "message": span.error}
+                                if span.error else {"code": 0}
+                            ),
+                        }
+                        for span in self.spans
+                    ],
+                }],
+            }]
+        }
+
+    def export(self) -> None:
+        if TRACE_FORMAT == "otel":
+            print(json_dumps(self.to_otel(), default=str))
+        else:
+            print(json_dumps({"trace": self.to_json()}, default=str))
+
+
+def _ms(nanoseconds: int) -> float:
+    return round(nanoseconds / 1e6, 3)
+
+
+def _otel_attributes(attributes: Dict[str, Any]) -> List[dict]:
+    values = []
+    for key, value in attributes.items():
+        if isinstance(value, bool):
+            value = {"boolValue": value}
+        elif isinstance(value, int):
+            value = {"intValue": str(value)}
+        elif isinstance(value, float):
+            value = {"doubleValue": value}
+        else:
+            value = {"stringValue": str(value)}
+        values.append({"key": key, "value": value})
+    return values
+
+
+def start_trace(name: str, event: dict = None) -> Optional[Trace]:
+    """
+    Starts the trace of a request when it is sampled.
+
+    Args:
+        name (str): Name of the root span, usually the handler.
+        event (dict, optional): The lambda event, a truthy X-Trace header
+            forces the trace while TRACE_ENABLED.
+
+    Returns:
+        Optional[Trace]: The trace, None if the request is not traced.
+    """
+    if not TRACE_ENABLED:
+        return None
+
+    headers = (event or {}).get("headers") or {}
+    forced = headers.get(TRACE_HEADER) or headers.get(TRACE_HEADER.lower())
+    if not forced and random() >= TRACE_SAMPLE_RATE:
+        return None
+
+    trace = Trace(name)
+    _current_trace.set(trace)
+    return trace
+
+
+def end_trace(trace: Optional[Trace]) -> None:
+    """Closes the root span and exports the trace."""
+    if trace is None:
+        return
+    trace.end_span(trace.root)
+    _current_trace.set(None)
+    trace.export()
+
+
+def is_tracing() -> bool:
+    return _current_trace.get() is not None
+
+
+def span(name: str, **attributes: Any):
+    """
+    Context manager timing the block as a span of the current trace.
+
+        with span("s3.upload", key=key_name):
+            ...
+
+    When the request is not traced the same no-op object is returned.
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        return NOOP_SPAN
+    return trace.start_span(name, attributes)
+
+
+def add_span(name: str, seconds: float, **attributes: Any) -> None:
+    """Records an already finished operation in the current trace."""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add_span(name, seconds, attributes)
+
+
+def _before_aws_call(model, context, **kwargs) -> None:
+    trace = _current_trace.get()
+    if trace is not None:
+        context["trace_span"] = trace.start_span(
+            f"{model.service_model.service_name}.{model.name}"
+        )
+
+
+def _after_aws_call(
+    context, http_response=None, exception=None, **kwargs
+) -> None:
+    span_ = context.pop("trace_span", None)
+    if span_ is not None:
+        span_.set_attribute(
+            "http.status_code", getattr(http_response, "status_code", 0)
+        )
+        if exception is not None:
+            span_.error = f"{type(exception).__name__}: {exception}"
+        span_.trace.end_span(span_)
+
+
+def instrument_client(client) -> Any:
+    """Adds a span per API call made with a boto3 client."""
+    client.meta.events.register("before-call", _before_aws_call)
+    client.meta.events.register("after-call", _after_aws_call)
+    client.meta.events.register("after-call-error", _after_aws_call)
+    return client
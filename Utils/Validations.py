@@ -7,6 +7,7 @@ from Utils.GeneralTools import (
 )
 from sqlalchemy import select
 from re import fullmatch as re_fullmatch
+from functools import lru_cache
 from base64 import decodebytes as base64_decodebytes
 from Utils.QueryTools import get_pk_name
 from Utils.CalculationTools import str_to_date, str_to_datetime
@@ -17,12 +18,15 @@ from typepy import (
     String as tp_String,
     List as tp_List,
 )
-from typing import Any, List, Dict, Union, Tuple
+from typing import Any, Callable, List, Dict, Union, Tuple
 
 DATE_TYPE = "date"
 DATETIME_TYPE = "datetime"
 EMAIL_TYPE = "email"
 
+FILE_MAX_SIZE = 2097152
+FILE_VALID_EXTENSIONS = ["jpg", "jpeg", "png", "gif", "webp", "pdf"]
+
 
 class Validations:
 
@@ -159,20 +163,32 @@ class Validations:
                 Defaults to False.
 
         Raises:
-            CustomException: If the validation fails.
+            AssertionError: If the validation fails.
         """
-        for field, expected_type in fields.items():
-            if is_update and field not in request:
-                continue
+        compile_fields(tuple(fields.items()))(request, is_update)
 
-            validate = self.validate([
-                self.param(
-                    field, expected_type, request.get(field, "")
-                )
-            ], cast=True)
+    @classmethod
+    def type_checker(cls, expected_type) -> Callable[[Any], bool]:
+        """
+        Builds the check_data_type(value, expected_type, cast=True) test
+        for a single type. Values already of the expected type skip the
+        typepy conversion.
+        """
+        if expected_type in cls.CUSTOM_TYPES:
+            return {
+                DATE_TYPE: cls.validate_date,
+                EMAIL_TYPE: cls.validate_email,
+                DATETIME_TYPE: cls.validate_datetime,
+            }[expected_type]
 
-            if not validate["isValid"]:
-                raise AssertionError(validate["data"])
+        type_ = cls.CAST_TYPES.get(expected_type, None)
+        if type_ is None:
+            return lambda value: type(value) is expected_type
+
+        tp_type, strict_level = type_["type"], type_["strict_level"]
+        return lambda value: type(value) is expected_type or tp_type(
+            value, strict_level=strict_level
+        ).try_convert() is not None
 
     @classmethod
     def check_data_type(
@@ -461,31 +477,34 @@ class Validations:
                 raise KeyError("File exceeds maximum allowed size")
 
     @staticmethod
-    def validate_file(
-        file: str, valid_extensions: List[str] = None, max_size: int = 2097152
-    ) -> None:
+    def split_base64_file(
+        file: str, valid_extensions: List[str] = None
+    ) -> Tuple[str, Union[str, None]]:
         """
-        Receives a base64 string and checks file extension and max size.
+        Splits an optional data URL prefix from a base64 string and checks
+        the declared extension.
 
         Args:
             file (str):
-                Base64 string of the file.
+                Base64 string of the file, optionally prefixed with
+                'data:<mime>;base64,'.
             valid_extensions (List[str], optional):
-                Allowed file extensions. Defaults to None.
-            max_size (int, optional):
-                The allowed maximum size in bytes. Defaults to 2MB.
+                Allowed file extensions. Defaults to FILE_VALID_EXTENSIONS.
+
+        Returns:
+            Tuple[str, Union[str, None]]:
+                The raw base64 payload and the declared extension (None if
+                the string has no prefix).
 
         Raises:
-            ValueError: If:
-                - The extension is not allowed.
-                - The file exceeds the maximum size.
-                - The file is not properly formatted.
+            ValueError: If the file is empty, the prefix is malformed or the
+                extension is not allowed.
         """
         if not file:
             raise ValueError("El archivo no puede estar vacío.")
 
         if valid_extensions is None:
-            valid_extensions = ["jpg", "jpeg", "png", "gif", "pdf"]
+            valid_extensions = FILE_VALID_EXTENSIONS
 
         if file.startswith("data:"):
             try:
@@ -500,6 +519,40 @@ class Validations:
             base64_data = file
             extension = None
 
+        if extension and extension not in valid_extensions:
+            raise ValueError(
+                f"La extensión '{extension}' no está permitida. "
+                f"Extensiones permitidas: {', '.join(valid_extensions)}"
+            )
+
+        return base64_data, extension
+
+    @classmethod
+    def validate_file(
+        cls,
+        file: str,
+        valid_extensions: List[str] = None,
+        max_size: int = FILE_MAX_SIZE,
+    ) -> None:
+        """
+        Receives a base64 string and checks file extension and max size.
+
+        Args:
+            file (str):
+                Base64 string of the file.
+            valid_extensions (List[str], optional):
+                Allowed file extensions. Defaults to None.
+            max_size (int, optional):
+                The allowed maximum size in bytes. Defaults to 2MB.
+
+        Raises:
+            ValueError: If:
+                - The extension is not allowed.
+                - The file exceeds the maximum size.
+                - The file is not properly formatted.
+        """
+        base64_data, _ = cls.split_base64_file(file, valid_extensions)
+
         try:
             file_data = base64.b64decode(base64_data)
         except base64.binascii.Error:
@@ -508,12 +561,6 @@ class Validations:
         if len(file_data) > max_size:
             raise ValueError("El archivo excede el tamaño máximo permitido.")
 
-        if extension and extension not in valid_extensions:
-            raise ValueError(
-                f"La extensión '{extension}' no está permitida. "
-                f"Extensiones permitidas: {', '.join(valid_extensions)}"
-            )
-
     @staticmethod
     def validate_email(email: str) -> bool:
         """Checks email is a valid email"""
@@ -675,6 +722,52 @@ class Validations:
             raise KeyError(f"Required param '{key}' not found.")
 
 
+@lru_cache(maxsize=256)
+def compile_fields(
+    fields: Tuple[Tuple[str, Any], ...]
+) -> Callable[[Dict[str, Any], bool], None]:
+    """
+    Compiles a fields spec, as used by Validations.validate_data, into a
+    validator function. Specs are compiled once per process and the error
+    messages are only built for the failing field.
+
+    Args:
+        fields (Tuple[Tuple[str, Any], ...]): The fields dict items.
+
+    Returns:
+        Callable[[Dict[str, Any], bool], None]:
+            validator(request, is_update), raising AssertionError with the
+            same messages as Validations.validate.
+    """
+    checks = tuple(
+        (field, expected_type, Validations.type_checker(expected_type))
+        for field, expected_type in fields
+    )
+
+    def validator(request: Dict[str, Any], is_update: bool = False) -> None:
+        for field, expected_type, check in checks:
+            if field in request:
+                value = request[field]
+            elif is_update:
+                continue
+            else:
+                value = ""
+
+            if value == "":
+                raise AssertionError([
+                    f"* La clave '{field}' no puede estar vacía."
+                ])
+
+            if not check(value):
+                raise AssertionError([
+                    f"El valor de la clave '{field}' "
+                    f"debe ser {expected_type},"
+                    f" no {type(value)}."
+                ])
+
+    return validator
+
+
 def check_query_limit(
     limit: Union[int, str] = 0, offset: Union[int, str] = 0, cast: bool = True
 ) -> Tuple[int, int]:
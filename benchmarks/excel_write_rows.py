@@ -0,0 +1,106 @@
+"""
+Throughput of ExcelManager.write_rows against the previous cell by cell
+loop (worksheet.write per value, row validated per value).
+
+    python -m benchmarks.excel_write_rows [--rows 100000] [--cols 20]
+
+Both variants generate the same sheet through generate_regular_file, only
+the data rows loop differs.
+"""
+import argparse
+import os
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from tempfile import mkdtemp
+from shutil import rmtree
+from time import perf_counter
+from Utils.ExcelManager import ExcelManager
+
+
+class LegacyExcelManager(ExcelManager):
+    """ExcelManager writing rows as before the column writers."""
+
+    def write_rows(self, worksheet, column_names, rows, sample) -> int:
+        data_row_number: int = 0
+        for row in rows:
+            if type(row) is dict:
+                row = list(row.values())
+
+            data_row_number += 1
+            data_column_number: int = 0
+
+            for value in row:
+                self.validate_sheet_row(column_names, row)
+                worksheet.write(
+                    data_row_number,
+                    data_column_number,
+                    value,
+                    self.cell_format,
+                )
+                data_column_number += 1
+
+        return data_row_number
+
+
+def build_rows(rows: int, cols: int) -> list:
+    """Rows cycling through the column types of a typical export."""
+    start = datetime(2024, 1, 1)
+    makers = (
+        lambda i: i,
+        lambda i: i * 1.5,
+        lambda i: Decimal(i) / 100,
+        lambda i: f"Equipo {i}",
+        lambda i: start + timedelta(minutes=i),
+        lambda i: date(2024, 1, 1) + timedelta(days=i % 365),
+        lambda i: None if i % 3 else "Observación",
+    )
+    return [
+        [makers[col % len(makers)](i) for col in range(cols)]
+        for i in range(rows)
+    ]
+
+
+def run(manager_class, data: dict, directory: str) -> float:
+    manager = manager_class("bench", file_route=f"{directory}/")
+    started = perf_counter()
+    result = manager.generate_regular_file(data)
+    seconds = perf_counter() - started
+    assert result["success"], result["message"]
+    os.remove(result["file_route"])
+    return seconds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--cols", type=int, default=20)
+    args = parser.parse_args()
+
+    rows = build_rows(args.rows, args.cols)
+    data = {
+        "Hoja": {
+            "column_names": [f"col_{col}" for col in range(args.cols)],
+            "data": rows,
+        }
+    }
+    cells = args.rows * args.cols
+
+    directory = mkdtemp(prefix="bench_excel_")
+    try:
+        results = {
+            "legacy": run(LegacyExcelManager, data, directory),
+            "write_rows": run(ExcelManager, data, directory),
+        }
+    finally:
+        rmtree(directory, ignore_errors=True)
+
+    print(f"{args.rows} rows x {args.cols} columns ({cells} cells)")
+    for name, seconds in results.items():
+        print(
+            f"{name:>10}: {seconds:8.2f} s {cells / seconds:12,.0f} cells/s"
+        )
+    print(f"   speedup: {results['legacy'] / results['write_rows']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
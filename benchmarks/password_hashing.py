@@ -0,0 +1,65 @@
+"""
+Login throughput (password verifications per second) by bcrypt cost
+factor, verifying one at a time and through the PasswordHasher pool.
+
+    python -m benchmarks.password_hashing [--rounds 8 10 12] [--logins 32]
+
+The rehash on login (verify_and_update) is checked for every cost.
+"""
+import argparse
+from time import perf_counter
+from Utils.Auth.Passwords import PASSWORD_MAX_WORKERS, PasswordHasher
+
+PASSWORD = "s3cret-Passw0rd"
+
+
+def check_rehash(hasher: PasswordHasher, old_rounds: int) -> None:
+    """A hash of another cost is replaced once, then left alone."""
+    old_hash = PasswordHasher(old_rounds).hash(PASSWORD)
+
+    valid, new_hash = hasher.verify_and_update(PASSWORD, old_hash)
+    assert valid and hasher.get_rounds(new_hash) == hasher.rounds
+
+    valid, again = hasher.verify_and_update(PASSWORD, new_hash)
+    assert valid and again is None
+
+    assert hasher.verify_and_update("wrong", new_hash) == (False, None)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--rounds", type=int, nargs="+", default=[8, 10, 12])
+    parser.add_argument("--logins", type=int, default=32)
+    args = parser.parse_args()
+
+    print(
+        f"{args.logins} logins per cost, pool of {PASSWORD_MAX_WORKERS} "
+        "threads"
+    )
+    print(f"{'rounds':>6} {'serial/s':>10} {'pool/s':>10} {'ms/login':>9}")
+    for rounds in args.rounds:
+        hasher = PasswordHasher(rounds)
+        check_rehash(hasher, rounds - 1)
+
+        hashed = hasher.hash(PASSWORD)
+        pairs = [(PASSWORD, hashed)] * args.logins
+
+        started = perf_counter()
+        assert all(hasher.verify(*pair) for pair in pairs)
+        serial = perf_counter() - started
+
+        started = perf_counter()
+        assert all(hasher.verify_many(pairs))
+        pooled = perf_counter() - started
+
+        assert hasher.verify_async(PASSWORD, hashed).result()
+
+        print(
+            f"{rounds:>6} {args.logins / serial:>10.1f} "
+            f"{args.logins / pooled:>10.1f} "
+            f"{serial / args.logins * 1000:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
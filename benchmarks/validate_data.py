@@ -0,0 +1,80 @@
+"""
+Validations.validate_data (compiled fields) against the previous typepy
+path (validate + param per field) on User.fields.
+
+    python -m benchmarks.validate_data [--number 20000]
+"""
+import argparse
+from timeit import repeat
+from Classes.User import User
+from Utils.Validations import Validations
+
+
+def legacy_validate_data(request: dict, fields: dict, is_update=False):
+    """validate_data as before compile_fields."""
+    for field, expected_type in fields.items():
+        if is_update and field not in request:
+            continue
+
+        validate = Validations.validate([
+            Validations.param(field, expected_type, request.get(field, ""))
+        ], cast=True)
+
+        if not validate["isValid"]:
+            raise AssertionError(validate["data"])
+
+
+REQUEST = {
+    "first_name": "Ana",
+    "last_name": "Pérez",
+    "username": "aperez",
+    "password": "s3cret-Passw0rd",
+    "confirm_password": "s3cret-Passw0rd",
+    "email": "ana@example.com",
+    "phone_number": "3001234567",
+    "date_of_birth": "1990-05-17",
+    "gender_id": 2,
+    "document_type_id": 1,
+    "document_number": "1020304050",
+    "state_of_issue_id": 5,
+    "city_of_issue_id": 150,
+    "date_of_issue": "2008-05-20",
+}
+# Same request as sent in query strings, ids need the typepy conversion
+REQUEST_AS_STRINGS = {key: str(value) for key, value in REQUEST.items()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+
+    fields = User(None).fields
+    validations = Validations(None)
+
+    for name, request in (
+        ("typed", REQUEST), ("strings", REQUEST_AS_STRINGS)
+    ):
+        results = {
+            "legacy": min(repeat(
+                lambda: legacy_validate_data(request, fields),
+                number=args.number, repeat=5,
+            )),
+            "compiled": min(repeat(
+                lambda: validations.validate_data(request, fields),
+                number=args.number, repeat=5,
+            )),
+        }
+        print(f"User.fields, {name} values, {args.number} requests")
+        for variant, seconds in results.items():
+            print(
+                f"{variant:>10}: {seconds / args.number * 1e6:8.2f} us"
+                " per request"
+            )
+        print(
+            f"   speedup: {results['legacy'] / results['compiled']:.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Regression test of the User.get_user_data query plan: users are read
+without joining their addresses, so each user is one row and no DISTINCT
+is needed to undo a fan-out.
+"""
+import pytest
+from sqlalchemy.dialects import mysql
+from Classes.User import User
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def as_dict(self):
+        return self.rows
+
+
+class FakeDataBase:
+    def __init__(self):
+        self.statements = []
+
+    def query(self, stmt):
+        self.statements.append(stmt)
+        return FakeResult([])
+
+
+def compiled_user_query(query: dict) -> str:
+    user = User.__new__(User)
+    user.db = FakeDataBase()
+    user.bucket_name = "bucket"
+    user.s3_manager = None
+    user.get_user_data(
+        {"httpMethod": "GET", "queryStringParameters": query}
+    )
+
+    assert len(user.db.statements) == 1
+    return str(
+        user.db.statements[0].compile(
+            dialect=mysql.dialect(),
+            compile_kwargs={"literal_binds": True},
+        )
+    ).lower()
+
+
+@pytest.mark.parametrize("query", [{}, {"user_id": 1}])
+def test_user_query_has_no_address_join(query):
+    sql = compiled_user_query(query)
+
+    assert "addresses" not in sql
+    assert "distinct" not in sql
+
+
+def test_user_query_excludes_password():
+    sql = compiled_user_query({})
+
+    assert "users.password" not in sql
+    assert "users.user_id" in sql